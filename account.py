@@ -1,8 +1,7 @@
 from datetime import datetime, timedelta
-from handywrapper import api
 import os
 import dotenv
-import requests
+import httpClient
 import re
 import domainLookup
 import json
@@ -12,8 +11,12 @@ import atexit
 import signal
 import sys
 import threading
-import sqlite3
+import cacheStore
+import hashlib
+import heapq
+from concurrent.futures import ThreadPoolExecutor
 import logging
+from flask import g, has_request_context
 logger = logging.getLogger("firewallet")
 
 
@@ -65,8 +68,6 @@ HSD_CONFIG = {
     ]
 }
 
-TX_CACHE_TTL = 3600
-DOMAIN_CACHE_TTL = int(os.getenv("CACHE_TTL",90))
 
 if not os.path.exists('hsdconfig.json'):
     with open('hsdconfig.json', 'w') as f:
@@ -77,8 +78,8 @@ else:
         for key in hsdConfigTMP:
             HSD_CONFIG[key] = hsdConfigTMP[key]
 
-hsd = api.hsd(HSD_API, HSD_IP, HSD_NODE_PORT)
-hsw = api.hsw(HSD_API, HSD_IP, HSD_WALLET_PORT)
+hsd = httpClient.hsd(HSD_API, HSD_IP, HSD_NODE_PORT)
+hsw = httpClient.hsw(HSD_API, HSD_IP, HSD_WALLET_PORT)
 
 # Verify the connection
 response = hsd.getInfo()
@@ -86,6 +87,46 @@ response = hsd.getInfo()
 EXCLUDE = os.getenv("EXCLUDE","primary").split(",")
 
 
+NODE_INFO_TTL = 2  # Seconds to share node info between requests
+NODE_INFO_CACHE = {"time": 0, "info": {}}
+NODE_INFO_LOCK = threading.Lock()
+
+
+def requestMemo(key, func, *args):
+    """
+    Call func at most once per request for the given key.
+    Outside of a request (background threads) func is always called.
+    """
+    if not has_request_context():
+        return func(*args)
+    memo = g.setdefault("memo", {})
+    if key not in memo:
+        memo[key] = func(*args)
+    return memo[key]
+
+
+def fetchNodeInfo():
+    """Get hsd's info, shared between requests for NODE_INFO_TTL seconds."""
+    with NODE_INFO_LOCK:
+        if time.time() - NODE_INFO_CACHE["time"] < NODE_INFO_TTL:
+            return NODE_INFO_CACHE["info"]
+
+    info = hsd.getInfo()
+    if 'error' not in info:
+        with NODE_INFO_LOCK:
+            NODE_INFO_CACHE["time"] = time.time()
+            NODE_INFO_CACHE["info"] = info
+    return info
+
+
+def getNodeInfo():
+    return requestMemo("nodeInfo", fetchNodeInfo)
+
+
+def getAccountInfo(account: str):
+    return requestMemo(("accountInfo", account), hsw.getAccountInfo, account, 'default')
+
+
 def hsdConnected():
     if hsdVersion() == -1:
         return False
@@ -93,7 +134,7 @@ def hsdConnected():
 
 
 def hsdVersion(format=True):
-    info = hsd.getInfo()
+    info = getNodeInfo()
     if 'error' in info:
         logger.error(f"HSD connection error: {info.get('error', 'Unknown error')}")
         return -1
@@ -122,7 +163,7 @@ def check_account(cookie: str | None):
     if len(account) < 1:
         return False
     # Check if the account is valid
-    info = hsw.getAccountInfo(account, 'default')
+    info = getAccountInfo(account)
     if 'error' in info:
         logger.error(f"HSW error checking account {account}: {info.get('error', 'Unknown error')}")
         return False
@@ -159,7 +200,7 @@ def createWallet(account: str, password: str):
         }
     # Create the account
     # Python wrapper doesn't support this yet
-    response = requests.put(get_wallet_api_url(f"wallet/{account}"))
+    response = httpClient.put(get_wallet_api_url(f"wallet/{account}"))
     if response.status_code != 200:
         return {
             "error": {
@@ -172,7 +213,7 @@ def createWallet(account: str, password: str):
     seed = seed['mnemonic']['phrase']
 
     # Encrypt the wallet (python wrapper doesn't support this yet)
-    response = requests.post(get_wallet_api_url(f"/wallet/{account}/passphrase"),
+    response = httpClient.post(get_wallet_api_url(f"/wallet/{account}/passphrase"),
                              json={"passphrase": password})
 
     return {
@@ -196,7 +237,7 @@ def importWallet(account: str, password: str, seed: str):
         "mnemonic": seed,
     }
 
-    response = requests.put(get_wallet_api_url(f"/wallet/{account}"), json=data)
+    response = httpClient.put(get_wallet_api_url(f"/wallet/{account}"), json=data)
     if response.status_code != 200:
         return {
             "error": {
@@ -235,34 +276,9 @@ def selectWallet(account: str):
         }
     
 
-def init_domain_db():
-    """Initialize the SQLite database for domain cache."""
-    os.makedirs('cache', exist_ok=True)
-    db_path = os.path.join('cache', 'domains.db')
-    
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Create the domains table if it doesn't exist
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS domains (
-        name TEXT PRIMARY KEY,
-        info TEXT,
-        last_updated INTEGER
-    )
-    ''')
-    
-    conn.commit()
-    conn.close()
-
-
 def getCachedDomains():
     """Get cached domain information from SQLite database."""
-    init_domain_db()  # Ensure DB exists
-    
-    db_path = os.path.join('cache', 'domains.db')
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row  # This allows accessing columns by name
+    conn = cacheStore.getConnection('domains')
     cursor = conn.cursor()
     
     # Get all domains from the database
@@ -278,83 +294,175 @@ def getCachedDomains():
         except json.JSONDecodeError:
             logger.error(f"Error parsing cached data for domain {row['name']}")
     
-    conn.close()
     return domain_cache
 
 
-ACTIVE_DOMAIN_UPDATES = set()  # Track domains being updated
-DOMAIN_UPDATE_LOCK = threading.Lock()  # For thread-safe access to ACTIVE_DOMAIN_UPDATES
+DOMAIN_REFRESH_WORKERS = int(os.getenv("DOMAIN_REFRESH_WORKERS", 4))  # Concurrent domain fetches
+DOMAIN_REFRESH_QUEUE_SIZE = int(os.getenv("DOMAIN_REFRESH_QUEUE_SIZE", 10000))
+
+# Deduplicating priority queue of domains waiting to be refreshed.
+# Heap entries are [priority, sequence, name]; superseded entries have their name set to None.
+DOMAIN_REFRESH_HEAP = []
+DOMAIN_REFRESH_QUEUED = {}  # name -> {"entry", "height", "version"}
+DOMAIN_REFRESH_ACTIVE = set()  # Domains currently being fetched
+DOMAIN_REFRESH_CONDITION = threading.Condition()
+DOMAIN_REFRESH_SCHEDULER = {"pid": None, "sequence": 0}
+DOMAIN_REFRESH_STATS = {"fetched": 0, "failed": 0, "dropped": 0, "fetchTime": 0.0, "lastFetch": 0.0}
 
-def update_domain_cache(domain_names: list):
-    """Fetch domain info and update the SQLite cache."""
+
+def update_domain_cache(domain_names: list, height: int = 0, version: str = "", priorities: dict = None):
+    """
+    Queue domains to be fetched and stored in the SQLite cache.
+    Entries are stored with the block height and wallet version they were queued at.
+    Domains with a lower priority (days until expiry) are fetched first.
+    """
     if not domain_names:
         return
-    
-    # Filter out domains that are already being updated
-    domains_to_update = []
-    with DOMAIN_UPDATE_LOCK:
+    priorities = priorities or {}
+
+    startDomainRefresh()
+    with DOMAIN_REFRESH_CONDITION:
         for domain in domain_names:
-            if domain not in ACTIVE_DOMAIN_UPDATES:
-                ACTIVE_DOMAIN_UPDATES.add(domain)
-                domains_to_update.append(domain)
-    
-    if not domains_to_update:
-        # All requested domains are already being updated
-        return
-        
-    try:
-        # Initialize database
-        init_domain_db()
-        
-        db_path = os.path.join('cache', 'domains.db')
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        for domain_name in domains_to_update:
-            try:
-                # Get domain info from node
-                domain_info = getDomain(domain_name)
-                
-                if 'error' in domain_info or not domain_info.get('info'):
-                    logger.error(f"Failed to get info for domain {domain_name}: {domain_info.get('error', 'Unknown error')}")
+            if domain in DOMAIN_REFRESH_ACTIVE:
+                continue
+            priority = priorities.get(domain, float("inf"))
+            queued = DOMAIN_REFRESH_QUEUED.get(domain)
+            if queued:
+                # Already waiting, store with the newest state
+                queued["height"] = height
+                queued["version"] = version
+                if priority >= queued["entry"][0]:
                     continue
-                
-                # Update or insert into database
-                now = int(time.time())
-                serialized_info = json.dumps(domain_info)
-                
-                cursor.execute(
-                    'INSERT OR REPLACE INTO domains (name, info, last_updated) VALUES (?, ?, ?)',
-                    (domain_name, serialized_info, now)
-                )
-                
-                logger.info(f"Updated cache for domain {domain_name}")
-            except Exception as e:
-                logger.error(f"Error updating cache for domain {domain_name}: {str(e)}", exc_info=True)
-            finally:
-                # Always remove from active set, even if there was an error
-                with DOMAIN_UPDATE_LOCK:
-                    if domain_name in ACTIVE_DOMAIN_UPDATES:
-                        ACTIVE_DOMAIN_UPDATES.remove(domain_name)
-        
-        # Commit all changes at once
-        conn.commit()
-        conn.close()
-        
-    except Exception as e:
-        logger.error(f"Error updating domain cache: {str(e)}", exc_info=True)
-        # Make sure to clean up the active set on any exception
-        with DOMAIN_UPDATE_LOCK:
-            for domain in domains_to_update:
-                if domain in ACTIVE_DOMAIN_UPDATES:
-                    ACTIVE_DOMAIN_UPDATES.remove(domain)
-    
-    logger.info("Updated cache for domains")
+                queued["entry"][2] = None
+            elif len(DOMAIN_REFRESH_QUEUED) >= DOMAIN_REFRESH_QUEUE_SIZE:
+                DOMAIN_REFRESH_STATS["dropped"] += 1
+                continue
+
+            DOMAIN_REFRESH_SCHEDULER["sequence"] += 1
+            entry = [priority, DOMAIN_REFRESH_SCHEDULER["sequence"], domain]
+            heapq.heappush(DOMAIN_REFRESH_HEAP, entry)
+            DOMAIN_REFRESH_QUEUED[domain] = {"entry": entry, "height": height, "version": version}
+        DOMAIN_REFRESH_CONDITION.notify_all()
+
+
+def getDomainRefreshPending() -> set:
+    """Snapshot of the domains queued or being fetched."""
+    with DOMAIN_REFRESH_CONDITION:
+        return set(DOMAIN_REFRESH_QUEUED) | DOMAIN_REFRESH_ACTIVE
+
+
+def startDomainRefresh():
+    """Start the refresh workers for this process (safe to call repeatedly and after forking)."""
+    with DOMAIN_REFRESH_CONDITION:
+        if DOMAIN_REFRESH_SCHEDULER["pid"] == os.getpid():
+            return
+        DOMAIN_REFRESH_SCHEDULER["pid"] = os.getpid()
+        # Work queued by the parent process has no workers in this one
+        DOMAIN_REFRESH_ACTIVE.clear()
+    for _ in range(max(DOMAIN_REFRESH_WORKERS, 1)):
+        threading.Thread(target=domainRefreshWorker, daemon=True).start()
+
+
+def nextDomainRefresh():
+    """Wait for the most urgent queued domain and mark it as active."""
+    with DOMAIN_REFRESH_CONDITION:
+        while True:
+            while DOMAIN_REFRESH_HEAP:
+                entry = heapq.heappop(DOMAIN_REFRESH_HEAP)
+                domain = entry[2]
+                if domain is None:
+                    continue
+                queued = DOMAIN_REFRESH_QUEUED.pop(domain)
+                DOMAIN_REFRESH_ACTIVE.add(domain)
+                return domain, queued["height"], queued["version"]
+            DOMAIN_REFRESH_CONDITION.wait()
+
+
+def domainRefreshWorker():
+    while True:
+        domain_name, height, version = nextDomainRefresh()
+        start = time.time()
+        success = False
+        try:
+            success = refreshDomain(domain_name, height, version)
+        except Exception as e:
+            logger.error(f"Error updating cache for domain {domain_name}: {str(e)}", exc_info=True)
+        finally:
+            with DOMAIN_REFRESH_CONDITION:
+                DOMAIN_REFRESH_ACTIVE.discard(domain_name)
+                DOMAIN_REFRESH_STATS["fetched" if success else "failed"] += 1
+                DOMAIN_REFRESH_STATS["lastFetch"] = time.time() - start
+                DOMAIN_REFRESH_STATS["fetchTime"] += DOMAIN_REFRESH_STATS["lastFetch"]
+
+
+def refreshDomain(domain_name: str, height: int, version: str) -> bool:
+    """Fetch domain info from the node and store it in the cache."""
+    domain_info = getDomain(domain_name)
+    if 'error' in domain_info or not domain_info.get('info'):
+        logger.error(f"Failed to get info for domain {domain_name}: {domain_info.get('error', 'Unknown error')}")
+        return False
+
+    conn = cacheStore.getConnection('domains')
+    conn.execute(
+        'INSERT OR REPLACE INTO domains (name, info, last_updated, height, version) VALUES (?, ?, ?, ?, ?)',
+        (domain_name, json.dumps(domain_info), int(time.time()), height, version)
+    )
+    conn.commit()
+    logger.info(f"Updated cache for domain {domain_name}")
+    return True
+
+
+def getDomainRefreshStats() -> dict:
+    """Get the refresh queue depth and fetch latency."""
+    with DOMAIN_REFRESH_CONDITION:
+        completed = DOMAIN_REFRESH_STATS["fetched"] + DOMAIN_REFRESH_STATS["failed"]
+        return {
+            "queued": len(DOMAIN_REFRESH_QUEUED),
+            "active": len(DOMAIN_REFRESH_ACTIVE),
+            "workers": DOMAIN_REFRESH_WORKERS,
+            "fetched": DOMAIN_REFRESH_STATS["fetched"],
+            "failed": DOMAIN_REFRESH_STATS["failed"],
+            "dropped": DOMAIN_REFRESH_STATS["dropped"],
+            "avgFetchMs": round(DOMAIN_REFRESH_STATS["fetchTime"] / completed * 1000, 1) if completed else 0,
+            "lastFetchMs": round(DOMAIN_REFRESH_STATS["lastFetch"] * 1000, 1),
+        }
+
+
+DOMAIN_QUERY_CHUNK = 500  # Names per query (SQLite limits the number of parameters)
+
+
+def getCachedDomainRows(domain_names: list) -> dict:
+    """Look up the cached rows for many domains using one query per chunk of names."""
+    cursor = cacheStore.getConnection('domains').cursor()
+    rows = {}
+    for i in range(0, len(domain_names), DOMAIN_QUERY_CHUNK):
+        chunk = domain_names[i:i+DOMAIN_QUERY_CHUNK]
+        placeholders = ",".join("?" * len(chunk))
+        cursor.execute(
+            f'SELECT name, info, height, version FROM domains WHERE name IN ({placeholders})',
+            chunk
+        )
+        for row in cursor.fetchall():
+            rows[row['name']] = row
+    return rows
+
+
+def isStaleDomain(row, domain_info: dict, height: int, wallet_version: str) -> bool:
+    """
+    Check if a cached domain row needs refreshing.
+    Closed names only change through the wallet's own transactions,
+    names in auction also change state with every block.
+    """
+    if row['version'] != wallet_version or row['height'] is None:
+        return True
+    if row['height'] >= height:
+        return False
+    return domain_info.get('info', {}).get('state', "") != "CLOSED"
 
 
 def getBalance(account: str):
     # Get the total balance
-    info = hsw.getBalance('default', account)
+    info = getWalletBalance(account)
     if 'error' in info:
         logger.error(f"Error getting balance for account {account}: {info['error']}")
         return {'available': 0, 'total': 0}
@@ -371,65 +479,47 @@ def getBalance(account: str):
     domains = getDomains(account)
     domainValue = 0
     domains_to_update = []  # Track domains that need cache updates
+    priorities = {}  # Refresh names closest to expiring first
     
     if isSPV():
-        # Initialize database if needed
-        init_domain_db()
-        
-        # Connect to the database directly for efficient querying
-        db_path = os.path.join('cache', 'domains.db')
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        now = int(time.time())
-        cache_cutoff = now - (DOMAIN_CACHE_TTL * 86400)  # Cache TTL in days
+        height = getBlockHeight()
+        wallet_version = walletVersion(account)
+        rows = getCachedDomainRows([domain['name'] for domain in domains])
+
+        # Snapshot the domains already queued for a refresh
+        active_updates = getDomainRefreshPending()
         
         for domain in domains:
             domain_name = domain['name']
-            
-            # Check if domain is in cache and still fresh
-            cursor.execute(
-                'SELECT info, last_updated FROM domains WHERE name = ?', 
-                (domain_name,)
-            )
-            row = cursor.fetchone()
+            row = rows.get(domain_name)
+
+            domain_info = None
+            if row:
+                try:
+                    domain_info = json.loads(row['info'])
+                except json.JSONDecodeError:
+                    logger.warning(f"Error parsing cached data for domain {domain_name}")
             
             # Only add domain for update if:
             # 1. Not in cache or stale
             # 2. Not currently being updated by another thread
-            with DOMAIN_UPDATE_LOCK:
-                if (not row or row['last_updated'] < cache_cutoff) and domain_name not in ACTIVE_DOMAIN_UPDATES:
+            if domain_info is None or isStaleDomain(row, domain_info, height, wallet_version):
+                if domain_name not in active_updates:
                     domains_to_update.append(domain_name)
+                    priorities[domain_name] = (domain.get('stats') or {}).get('daysUntilExpire', float("inf"))
                     continue
                 
             # Use the cached info
-            try:
-                if row:  # Make sure we have data
-                    domain_info = json.loads(row['info'])
-                    if domain_info.get('info', {}).get('state', "") == "CLOSED":
-                        domainValue += domain_info.get('info', {}).get('value', 0)
-            except json.JSONDecodeError:
-                logger.warning(f"Error parsing cached data for domain {domain_name}")
-                # Only add for update if not already being updated
-                with DOMAIN_UPDATE_LOCK:
-                    if domain_name not in ACTIVE_DOMAIN_UPDATES:
-                        domains_to_update.append(domain_name)
-        
-        conn.close()
+            if domain_info and domain_info.get('info', {}).get('state', "") == "CLOSED":
+                domainValue += domain_info.get('info', {}).get('value', 0)
     else:
         for domain in domains:
             if domain['state'] == "CLOSED":
                 domainValue += domain['value']
     
-    # Start background thread to update cache for missing domains
+    # Queue a background refresh for missing domains
     if domains_to_update:
-        thread = threading.Thread(
-            target=update_domain_cache,
-            args=(domains_to_update,),
-            daemon=True
-        )
-        thread.start()
+        update_domain_cache(domains_to_update, height, wallet_version, priorities)
         
     total = total - (domainValue/1000000)
     locked = locked - (domainValue/1000000)
@@ -444,7 +534,7 @@ def getBalance(account: str):
 
 def getBlockHeight():
     # Get the block height
-    info = hsd.getInfo()
+    info = getNodeInfo()
     if 'error' in info:
         return 0
     return info['chain']['height']
@@ -452,35 +542,89 @@ def getBlockHeight():
 
 def getAddress(account: str):
     # Get the address
-    info = hsw.getAccountInfo(account, 'default')
+    info = getAccountInfo(account)
     if 'error' in info:
         return ''
     return info['receiveAddress']
 
 
+PENDING_TX = {}  # account -> {"version", "txs", "updated"}
+PENDING_TX_LOCK = threading.Lock()
+PENDING_TX_MAX_AGE = 60  # Seconds before a wallet nobody is watching has its pending txs refetched
+PENDING_TX_TRACKER = {"pid": None}
+
+
+def getPendingTransactions(account: str) -> list:
+    """
+    Get the wallet's unconfirmed transactions from memory.
+    They are refetched on each new block, when the events poller sees the wallet change,
+    or on access once they are PENDING_TX_MAX_AGE seconds old.
+    """
+    startPendingTracker()
+    with PENDING_TX_LOCK:
+        pending = PENDING_TX.get(account)
+    if pending and time.time() - pending["updated"] < PENDING_TX_MAX_AGE:
+        return pending["txs"]
+    return refreshPendingTransactions(account)
+
+
+def refreshPendingTransactions(account: str, version=None) -> list:
+    """Fetch the wallet's unconfirmed transactions, unless they were already fetched for this wallet version."""
+    with PENDING_TX_LOCK:
+        pending = PENDING_TX.get(account)
+        if version is not None and pending and pending["version"] == version:
+            pending["updated"] = time.time()
+            return pending["txs"]
+
+    txs = hsw.getPendingTransactions(account)
+    if not isinstance(txs, list):
+        error = txs.get('error') if isinstance(txs, dict) else txs
+        logger.error(f"Error getting pending transactions for account {account}: {error}")
+        return pending["txs"] if pending else []
+
+    with PENDING_TX_LOCK:
+        PENDING_TX[account] = {"version": version, "txs": txs, "updated": time.time()}
+    return txs
+
+
+def refreshAllPendingTransactions(height: int):
+    """Refetch the pending txs of every wallet seen so far, as a new block can confirm them."""
+    with PENDING_TX_LOCK:
+        accounts = list(PENDING_TX)
+    for account in accounts:
+        refreshPendingTransactions(account)
+
+
+def startPendingTracker():
+    """Refresh pending txs on new blocks in this process (safe to call repeatedly and after forking)."""
+    with PENDING_TX_LOCK:
+        if PENDING_TX_TRACKER["pid"] == os.getpid():
+            return
+        PENDING_TX_TRACKER["pid"] = os.getpid()
+    if refreshAllPendingTransactions in BLOCK_LISTENERS:
+        # Registered before forking
+        startChainWatcher()
+    else:
+        onNewBlock(refreshAllPendingTransactions)
+
+
 def getPendingTX(account: str):
-    pending = 0
-    page = 1
-    pageSize = 10
-    while True:
-        txs = getTransactions(account, page, pageSize)
-        page += 1
-        pendingPage = 0
-        for tx in txs:
-            if tx['confirmations'] < 1:
-                pending += 1
-                pendingPage += 1
-        if pendingPage < pageSize:
-            break
-    return pending
+    return len(getPendingTransactions(account))
 
 
 def getDomains(account, own=True):
+    return requestMemo(("domains", account, own), fetchDomains, account, own)
+
+
+def fetchDomains(account, own=True):
     if own:
-        response = requests.get(get_wallet_api_url(f"/wallet/{account}/name?own=true"))
+        response = httpClient.get(get_wallet_api_url(f"/wallet/{account}/name?own=true"))
     else:
-        response = requests.get(get_wallet_api_url(f"/wallet/{account}/name"))
+        response = httpClient.get(get_wallet_api_url(f"/wallet/{account}/name"))
     info = response.json()
+    if not isinstance(info, list):
+        # Pass errors on instead of treating them as a list of domains
+        return info if isinstance(info, dict) and 'error' in info else {"error": {"message": "Invalid response from wallet"}}
 
     if SHOW_EXPIRED:
         return info
@@ -496,139 +640,292 @@ def getDomains(account, own=True):
 
     return domains
 
-def init_tx_page_db():
-    """Initialize the SQLite database for transaction page cache."""
-    os.makedirs('cache', exist_ok=True)
-    db_path = os.path.join('cache', 'tx_pages.db')
-    
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Create the tx_pages table if it doesn't exist
-    cursor.execute('''
-    CREATE TABLE IF NOT EXISTS tx_pages (
-        account TEXT,
-        page_key TEXT,
-        txid TEXT,
-        timestamp INTEGER,
-        PRIMARY KEY (account, page_key)
-    )
-    ''')
-    
-    conn.commit()
-    conn.close()
+DOMAIN_SORT_COLUMNS = {
+    "name": "name",
+    "expiry": "expires IS NULL, expires",
+    "value": "value",
+    "state": "state",
+}
 
-def getPageTXCache(account, page, size=100):
-    """Get cached transaction ID from SQLite database."""
-    account = getxPub(account)
-    page_key = f"{page}-{size}"
-    
-    # Initialize database if needed
-    init_tx_page_db()
-    
-    db_path = os.path.join('cache', 'tx_pages.db')
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Query for the cached transaction ID
-    cursor.execute(
-        'SELECT txid, timestamp FROM tx_pages WHERE account = ? AND page_key = ?',
-        (account, page_key)
-    )
-    row = cursor.fetchone()
-    conn.close()
-    
-    if row and row[1] > int(time.time()) - TX_CACHE_TTL:
-        return row[0]  # Return the cached txid
-    return None
-
-def pushPageTXCache(account, page, txid, size=100):
-    """Store transaction ID in SQLite database."""
-    account = getxPub(account)
-    page_key = f"{page}-{size}"
-    
-    # Initialize database if needed
-    init_tx_page_db()
-    
-    db_path = os.path.join('cache', 'tx_pages.db')
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Insert or replace the transaction ID
-    cursor.execute(
-        'INSERT OR REPLACE INTO tx_pages (account, page_key, txid, timestamp) VALUES (?, ?, ?, ?)',
-        (account, page_key, txid, int(time.time()))
-    )
-    
-    conn.commit()
-    conn.close()
-    
-    return txid
 
-def getTXFromPage(account, page, size=100):
-    if page == 1:
-        return getTransactions(account, 1, size)[-1]['hash']
+def syncWalletDomains(account: str):
+    """
+    Store the wallet's domains in the local domain table.
+    The table is only rebuilt when the chain or wallet state changes.
+    Returns (index key, error). The error is only set when the wallet couldn't be read
+    and there are no previously synced domains to fall back to.
+    """
+    key = getWalletIndexKey(account)
+    if not key:
+        return None, {"message": "Error getting wallet"}
+    version = cacheVersion(account)
+
+    conn = cacheStore.getConnection('wallet_domains')
+    state = conn.execute('SELECT version FROM wallet_domains_sync WHERE account = ?', (key,)).fetchone()
+    if state and state['version'] == version:
+        return key, None
 
-    cached = getPageTXCache(account, page, size)
-    if cached:
-        return getPageTXCache(account, page, size)
-    previous = getTransactions(account, page, size)
-    if len(previous) == 0:
+    domains = getDomains(account)
+    if not isinstance(domains, list):
+        logger.error(f"Error getting domains for account {account}: {domains}")
+        if state:
+            # Serve the last synced domains
+            return key, None
+        error = domains.get('error') if isinstance(domains, dict) else None
+        return key, error or {"message": "Error getting domains"}
+
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        conn.execute('DELETE FROM wallet_domains WHERE account = ?', (key,))
+        conn.executemany(
+            'INSERT OR REPLACE INTO wallet_domains (account, name, state, expires, value, data) VALUES (?, ?, ?, ?, ?, ?)',
+            [(key, domain['name'], domain.get('state'), (domain.get('stats') or {}).get('daysUntilExpire'),
+              domain.get('value', 0), json.dumps(domain)) for domain in domains]
+        )
+        conn.execute(
+            'INSERT OR REPLACE INTO wallet_domains_sync (account, version) VALUES (?, ?)',
+            (key, version)
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return key, None
+
+
+def getDomainsPage(account: str, offset: int = 0, limit=None, sort: str = "name", direction: str = "asc",
+                   state=None, expiresWithin=None, minValue=None) -> dict:
+    """
+    Get a sorted and filtered page of the wallet's domains from the local domain table.
+    Returns {"domains": [...], "total": number of domains matching the filters},
+    with an "error" when the wallet's domains couldn't be loaded.
+    """
+    key, error = syncWalletDomains(account)
+    if error:
+        return {"domains": [], "total": 0, "error": error}
+
+    where = ['account = ?']
+    params = [key]
+    if state:
+        where.append('state = ?')
+        params.append(state.upper())
+    if expiresWithin is not None:
+        where.append('expires <= ?')
+        params.append(expiresWithin)
+    if minValue is not None:
+        where.append('value >= ?')
+        params.append(int(minValue * 1000000))
+    where = ' AND '.join(where)
+
+    order = DOMAIN_SORT_COLUMNS.get(sort, "name")
+    if direction == "desc":
+        order = ', '.join(f"{column} DESC" for column in order.split(', '))
+
+    conn = cacheStore.getConnection('wallet_domains')
+    total = conn.execute(f'SELECT COUNT(*) FROM wallet_domains WHERE {where}', params).fetchone()[0]
+    rows = conn.execute(
+        f'SELECT data FROM wallet_domains WHERE {where} ORDER BY {order}, name LIMIT ? OFFSET ?',
+        params + [-1 if limit is None else limit, max(offset, 0)]
+    ).fetchall()
+    return {"domains": [json.loads(row['data']) for row in rows], "total": total}
+
+
+TX_SYNC_PAGE_SIZE = 100  # Transactions per tx/history request when syncing the index
+TX_REORG_DEPTH = int(os.getenv("TX_REORG_DEPTH", 10))  # Blocks to roll back when the chain reorgs
+TX_PENDING_HEIGHT = 2**31 - 1  # Stored height for unconfirmed txs so they sort first
+
+TX_SYNC_LOCKS = {}
+TX_SYNC_LOCKS_LOCK = threading.Lock()
+
+
+def getWalletIndexKey(account: str):
+    """Index wallet data by account key so a recreated wallet doesn't reuse old entries."""
+    key = getxPub(account)
+    if not isinstance(key, str):
         return None
-    hash = previous[-1]['hash']
-    pushPageTXCache(account, page, hash, size)
-    return hash
+    return key
 
 
-def getTransactions(account, page=1, limit=100):
-    # Get the transactions
-    if hsdVersion() < 7:
-        if page != 1:
-            return []
-        info = hsw.getWalletTxHistory(account)
-        if 'error' in info:
-            logger.error(f"Error getting transactions for account {account}: {info['error']}")
-            return []
-        return info[::-1]
+def getTXSyncLock(key: str) -> threading.Lock:
+    with TX_SYNC_LOCKS_LOCK:
+        if key not in TX_SYNC_LOCKS:
+            TX_SYNC_LOCKS[key] = threading.Lock()
+        return TX_SYNC_LOCKS[key]
 
-    lastTX = None
-    if page < 1:
-        return []
-    if page > 1:
-        lastTX = getTXFromPage(account, page-1, limit)
 
-    if lastTX:
-        response = requests.get(get_wallet_api_url(f"/wallet/{account}/tx/history?reverse=true&limit={limit}&after={lastTX}"))
-    elif page == 1:
-        response = requests.get(get_wallet_api_url(f"/wallet/{account}/tx/history?reverse=true&limit={limit}"))
-    else:
-        return []
+def getBlockHash(height: int):
+    """Get the hash of the block at a height, or None if it couldn't be looked up."""
+    try:
+        header = hsd.getHeaderByHashOrHeight(str(height))
+    except Exception as e:
+        logger.error(f"Error getting block header {height}: {str(e)}")
+        return None
+    if not isinstance(header, dict) or 'error' in header:
+        return None
+    return header.get('hash')
 
+
+def fetchTXHistory(account: str, after=None):
+    url = f"/wallet/{account}/tx/history?reverse=true&limit={TX_SYNC_PAGE_SIZE}"
+    if after:
+        url += f"&after={after}"
+    response = httpClient.get(get_wallet_api_url(url))
     if response.status_code != 200:
         logger.error(f"Error fetching transactions: {response.status_code} - {response.text}")
-        return []
-    data = response.json()
+        return None
+    return response.json()
 
-    # Refresh the cache if the next page is different
-    nextPage = getPageTXCache(account, page, limit)
-    if nextPage is not None and nextPage != data[-1]['hash']:
-        logger.info(f'Refreshing tx page {page}')
-        pushPageTXCache(account, page, data[-1]['hash'], limit)
-    return data
 
+def syncTransactions(account: str):
+    """
+    Bring the local transaction index up to date with the wallet.
+    Only transactions newer than the last synced block are fetched.
+    Returns the index key for the account or None if it couldn't be found.
+    """
+    key = getWalletIndexKey(account)
+    if not key:
+        return None
 
-def getAllTransactions(account):
-    # Get the transactions
-    page = 0
+    version = walletVersion(account)
+    chain = getNodeInfo().get('chain', {})
+    height = chain.get('height', 0)
+    tip = chain.get('tip')
+    if version == "error" or not tip:
+        # Serve whatever is already indexed
+        return key
+
+    with getTXSyncLock(key):
+        conn = cacheStore.getConnection('transactions')
+        state = conn.execute('SELECT height, block, version FROM tx_sync WHERE account = ?', (key,)).fetchone()
+        if state and state['version'] == version and state['block'] == tip:
+            return key
+
+        legacy = hsdVersion() < 7
+        anchor = None
+        if state and not legacy:
+            anchor = state['height']
+            if state['block'] != tip and getBlockHash(anchor) != state['block']:
+                # The last synced block is no longer in the chain (or couldn't be checked),
+                # so resync the last few blocks to be safe
+                anchor = max(anchor - TX_REORG_DEPTH, 0)
+                logger.info(f"Chain reorg detected, rolling back tx index to height {anchor}")
+                conn.execute('DELETE FROM txs WHERE account = ? AND height >= ?', (key, anchor))
+                conn.commit()
+                forgetChainTXs(anchor)
+            elif state['version'] == version:
+                # New block without any changes to the wallet
+                conn.execute('UPDATE tx_sync SET height = ?, block = ? WHERE account = ?', (height, tip, key))
+                conn.commit()
+                return key
+
+        if legacy:
+            txs = hsw.getWalletTxHistory(account)
+            if 'error' in txs:
+                logger.error(f"Error getting transactions for account {account}: {txs['error']}")
+                return key
+            txs = txs[::-1]
+        else:
+            txs = fetchNewTransactions(conn, key, account, anchor)
+            if txs is None:
+                return key
+
+        # Unconfirmed txs are always refetched, any not seen again have been dropped
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if anchor is None:
+                conn.execute('DELETE FROM txs WHERE account = ?', (key,))
+            else:
+                conn.execute('DELETE FROM txs WHERE account = ? AND height = ?', (key, TX_PENDING_HEIGHT))
+            seq = conn.execute('SELECT MAX(seq) FROM txs WHERE account = ?', (key,)).fetchone()[0] or 0
+            conn.executemany(
+                'INSERT OR REPLACE INTO txs (account, hash, height, seq, data) VALUES (?, ?, ?, ?, ?)',
+                [(key, tx['hash'], TX_PENDING_HEIGHT if tx.get('height', -1) < 0 else tx['height'],
+                  seq + len(txs) - i, json.dumps(tx)) for i, tx in enumerate(txs)]
+            )
+            conn.execute(
+                'INSERT OR REPLACE INTO tx_sync (account, height, block, version) VALUES (?, ?, ?, ?)',
+                (key, height, tip, version)
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        logger.info(f"Synced {len(txs)} transactions for account {account}")
+    return key
+
+
+def fetchNewTransactions(conn, key: str, account: str, anchor=None):
+    """
+    Page through the wallet history (newest first) until reaching a tx
+    already indexed below the anchor height.
+    """
     txs = []
+    after = None
     while True:
-        txs += getTransactions(account, page, 1000)
-        if len(txs) == 0:
-            break
-        page += 1
+        page = fetchTXHistory(account, after)
+        if page is None:
+            return None
+        if anchor is not None and page:
+            placeholders = ",".join("?" * len(page))
+            known = dict(conn.execute(
+                f'SELECT hash, height FROM txs WHERE account = ? AND hash IN ({placeholders})',
+                [key] + [tx['hash'] for tx in page]
+            ).fetchall())
+        else:
+            known = {}
+
+        for tx in page:
+            confirmed = tx.get('height', -1) >= 0
+            if anchor is not None and confirmed and tx['height'] < anchor and known.get(tx['hash']) == tx['height']:
+                # Everything older is already indexed
+                return txs
+            txs.append(tx)
+
+        if len(page) < TX_SYNC_PAGE_SIZE:
+            return txs
+        after = page[-1]['hash']
+
+
+def loadTransactions(rows) -> list:
+    """Load indexed txs, updating the confirmations for the current height."""
+    height = getBlockHeight()
+    txs = []
+    for row in rows:
+        tx = json.loads(row['data'])
+        if row['height'] != TX_PENDING_HEIGHT:
+            tx['confirmations'] = max(height - row['height'] + 1, tx.get('confirmations', 0))
+        txs.append(tx)
     return txs
 
 
+def getTransactions(account, page=1, limit=100):
+    # Get the transactions
+    if page < 1:
+        return []
+    key = syncTransactions(account)
+    if not key:
+        return []
+
+    rows = cacheStore.getConnection('transactions').execute(
+        'SELECT height, data FROM txs WHERE account = ? ORDER BY height DESC, seq DESC LIMIT ? OFFSET ?',
+        (key, limit, (page - 1) * limit)
+    ).fetchall()
+    return loadTransactions(rows)
+
+
+def getAllTransactions(account):
+    # Get the transactions
+    key = syncTransactions(account)
+    if not key:
+        return []
+
+    rows = cacheStore.getConnection('transactions').execute(
+        'SELECT height, data FROM txs WHERE account = ? ORDER BY height DESC, seq DESC',
+        (key,)
+    ).fetchall()
+    return loadTransactions(rows)
+
+
 def check_address(address: str, allow_name: bool = True, return_address: bool = False):
     # Check if the address is valid
     if address.startswith('@'):
@@ -640,7 +937,7 @@ def check_address(address: str, allow_name: bool = True, return_address: bool =
         return check_hip2(address[1:])
 
     # Check if the address is a valid HNS address
-    response = requests.post(get_node_api_url(), json={
+    response = httpClient.post(get_node_api_url(), json={
         "method": "validateaddress",
         "params": [address]
     }).json()
@@ -764,9 +1061,34 @@ def isOwnPrevout(account, prevout: dict):
     return False
     
 
+def getNamesByHash(namehashes: list) -> dict:
+    """
+    Look up many names from their hashes with a single batched RPC call to the node.
+    Returns {namehash: name} for the hashes the node found.
+    """
+    if not namehashes or isSPV():
+        return {}
+    try:
+        response = httpClient.post(get_node_api_url(), json=[
+            {"method": "getnamebyhash", "params": [namehash], "id": i}
+            for i, namehash in enumerate(namehashes)
+        ]).json()
+    except Exception as e:
+        logger.error(f"Error looking up names by hash: {str(e)}")
+        return {}
+    if not isinstance(response, list):
+        return {}
+
+    names = {}
+    for result in response:
+        if result.get('error') is None and result.get('result') and isinstance(result.get('id'), int):
+            names[namehashes[result['id']]] = result['result']
+    return names
+
+
 def getDomain(domain: str):
     if isSPV():
-        response = requests.get(f"https://hsd.hns.au/api/v1/name/{domain}").json()
+        response = httpClient.get(f"https://hsd.hns.au/api/v1/name/{domain}").json()
         if 'error' in response:
             return {
                 "error": {
@@ -797,7 +1119,7 @@ def isKnownDomain(domain: str) -> bool:
 
 def getAddressFromCoin(coinhash: str, coinindex = 0):
     # Get the address from the hash
-    response = requests.get(get_node_api_url(f"coin/{coinhash}/{coinindex}"))
+    response = httpClient.get(get_node_api_url(f"coin/{coinhash}/{coinindex}"))
     if response.status_code != 200:
         logger.error("Error getting address from coin")
         return "No Owner"
@@ -828,7 +1150,7 @@ def getDNS(domain: str):
     # Get the DNS
 
     if isSPV():
-        response = requests.get(f"https://hsd.hns.au/api/v1/nameresource/{domain}")
+        response = httpClient.get(f"https://hsd.hns.au/api/v1/nameresource/{domain}")
         if response.status_code != 200:
             return {
                 "error": f"Error fetching DNS records: {response.status_code}"
@@ -919,7 +1241,7 @@ def register(account, domain):
 
 
 def getNodeSync():
-    response = hsd.getInfo()
+    response = getNodeInfo()
     if 'error' in response:
         logger.error(f"Error getting node sync status: {response['error']}")
         return 0
@@ -968,105 +1290,344 @@ def getBids(account, domain="NONE"):
     return bids
 
 
+AUCTION_SORT_COLUMNS = {
+    "price": "value",
+    "state": "state",
+    "time": "bid_height",
+    "name": "name",
+    "domainTime": "domain_height",
+}
+
+
+def syncAuctions(account: str):
+    """
+    Store the wallet's bids with their domain info in the local auctions table.
+    The table is only updated when the chain or wallet state changes, and then only the changed bids are written.
+    Returns the index key for the account or None if it couldn't be found.
+    """
+    key = getWalletIndexKey(account)
+    if not key:
+        return None
+    version = cacheVersion(account)
+
+    conn = cacheStore.getConnection('auctions')
+    state = conn.execute('SELECT version FROM auctions_sync WHERE account = ?', (key,)).fetchone()
+    if state and state['version'] == version:
+        return key
+
+    bids = getBids(account)
+    domains = getDomains(account, False)
+    if not isinstance(domains, list):
+        logger.error(f"Error getting domains for account {account}: {domains}")
+        return key
+    domainsByName = {}
+    for seq, domain in enumerate(domains):
+        domainsByName[domain['name']] = (seq, domain)
+
+    rows = []
+    for seq, bid in enumerate(bids):
+        domain_seq, domain = domainsByName.get(bid['name'], (None, None))
+        rows.append((
+            key, f"{bid['prevout']['hash']}:{bid['prevout']['index']}", seq, bid['name'], bid['value'],
+            bid['height'], domain['state'] if domain else None, domain['height'] if domain else None,
+            domain_seq, json.dumps(bid), json.dumps(domain) if domain else None
+        ))
+
+    # Only write the bids that were added, removed or changed since the last sync
+    existing = {
+        row['bid']: tuple(row) for row in conn.execute(
+            '''
+            SELECT account, bid, seq, name, value, bid_height, state, domain_height, domain_seq, bid_data, domain_data
+            FROM auctions WHERE account = ?
+            ''',
+            (key,)
+        )
+    }
+    changed = [row for row in rows if existing.get(row[1]) != row]
+    removed = existing.keys() - {row[1] for row in rows}
+
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        conn.executemany('DELETE FROM auctions WHERE account = ? AND bid = ?', [(key, bid) for bid in removed])
+        conn.executemany(
+            '''
+            INSERT OR REPLACE INTO auctions
+                (account, bid, seq, name, value, bid_height, state, domain_height, domain_seq, bid_data, domain_data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''',
+            changed
+        )
+        conn.execute('INSERT OR REPLACE INTO auctions_sync (account, version) VALUES (?, ?)', (key, version))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return key
+
+
+def getAuctions(account: str, sort: str = "time", reverse: bool = False) -> dict:
+    """
+    Get the wallet's bids joined with their domains, sorted using the auctions table indexes.
+    Returns {"auctions": [(bid, domain)], "bids": total bids, "sortbyDomain": bool}.
+    sortbyDomain is set when the rows are ordered by domain rather than by bid.
+    """
+    result = {"auctions": [], "bids": 0, "sortbyDomain": False}
+    key = syncAuctions(account)
+    if not key:
+        return result
+
+    conn = cacheStore.getConnection('auctions')
+    result["bids"] = conn.execute('SELECT COUNT(*) FROM auctions WHERE account = ?', (key,)).fetchone()[0]
+
+    if sort == "time":
+        # Older HSD versions don't include the bid height so sort by domain height
+        first = conn.execute('SELECT bid_height FROM auctions WHERE account = ? ORDER BY seq LIMIT 1', (key,)).fetchone()
+        if first and first['bid_height'] == 0:
+            sort = "domainTime"
+    if sort not in AUCTION_SORT_COLUMNS:
+        sort = "name"
+    column = AUCTION_SORT_COLUMNS[sort]
+    result["sortbyDomain"] = sort in ["state", "domainTime"]
+
+    # Ties keep the wallet's order
+    order = f"{column} {'DESC' if reverse else 'ASC'}"
+    order += ", domain_seq, seq" if result["sortbyDomain"] else ", seq"
+    rows = conn.execute(
+        f'SELECT bid_data, domain_data FROM auctions WHERE account = ? AND domain_data IS NOT NULL ORDER BY {order}',
+        (key,)
+    ).fetchall()
+    result["auctions"] = [(json.loads(row['bid_data']), json.loads(row['domain_data'])) for row in rows]
+    return result
+
+
 def getReveals(account, domain):
     return hsw.getWalletRevealsByName(domain, account)
 
 
-def getPendingReveals(account):
+PENDING_ACTIONS = {}  # account -> {"version", "reveals", "registers", "redeems", "finalizes"}
+PENDING_ACTIONS_LOCKS = {}  # account -> lock held while that account's actions are found
+PENDING_ACTIONS_LOCK = threading.Lock()  # Guards PENDING_ACTIONS and PENDING_ACTIONS_LOCKS
+
+
+def getPendingActionsLock(account: str) -> threading.Lock:
+    with PENDING_ACTIONS_LOCK:
+        if account not in PENDING_ACTIONS_LOCKS:
+            PENDING_ACTIONS_LOCKS[account] = threading.Lock()
+        return PENDING_ACTIONS_LOCKS[account]
+
+
+def getPendingActions(account: str, password=None) -> dict:
+    """
+    Get the bids waiting to be revealed and registered, and the names waiting to be redeemed and finalized.
+    Bids, names and reveals are loaded once and matched in a single pass.
+    The result is cached until the next block or wallet change.
+    Redeems and finalizes need the password to create the transactions, without it they are left as None.
+    """
+    version = cacheVersion(account)
+    # Only requests for the same account wait for each other
+    with getPendingActionsLock(account):
+        with PENDING_ACTIONS_LOCK:
+            pending = PENDING_ACTIONS.get(account)
+        if pending is None or pending["version"] != version:
+            pending = {"version": version, "redeems": None, "finalizes": None, "passwordHash": None}
+            pending.update(findPendingBids(account))
+            with PENDING_ACTIONS_LOCK:
+                PENDING_ACTIONS[account] = pending
+
+        if password is None:
+            return pending
+
+        passwordHash = hashlib.sha256(password.encode()).hexdigest()
+        if pending["passwordHash"] != passwordHash:
+            redeemOutputs = getPendingRedeemTX(account, password)
+            if redeemOutputs is None:
+                # The wallet couldn't be unlocked, try again on the next request
+                return dict(pending, redeems=[], finalizes=[])
+            names = pending["namesByHash"]
+            pending["redeems"] = findPendingNames(redeemOutputs, 5, "REDEEM", names)
+            pending["finalizes"] = findPendingNames(getPendingFinalizeTX(account, password), 10, "FINALIZE", names)
+            pending["passwordHash"] = passwordHash
+        return pending
+
+
+def findPendingBids(account: str) -> dict:
+    """Match the wallet's bids against its names and reveals."""
     bids = getBids(account)
     domains = getDomains(account, False)
-    pending = []
+    reveals = hsw.getWalletReveals(account, True)
+    if not isinstance(domains, list):
+        domains = []
+    if not isinstance(reveals, list):
+        logger.error(f"Error getting reveals for account {account}: {reveals}")
+        reveals = []
+
+    bidsByName = {}
+    for bid in bids:
+        bidsByName.setdefault(bid['name'], []).append(bid)
+    revealedValues = {}
+    for reveal in reveals:
+        if reveal.get('own'):
+            revealedValues.setdefault(reveal['name'], set()).add(reveal['value'])
+
+    pendingReveals = []
+    pendingRegisters = []
     for domain in domains:
+        domainBids = bidsByName.get(domain['name'])
+        if not domainBids:
+            continue
         if domain['state'] == "REVEAL":
-            reveals = getReveals(account, domain['name'])
-            for bid in bids:
-                if bid['name'] == domain['name']:
-                    state_found = False
-                    for reveal in reveals:
-                        if reveal['own']:
-                            if bid['value'] == reveal['value']:
-                                state_found = True
+            revealed = revealedValues.get(domain['name'], set())
+            pendingReveals.extend(bid for bid in domainBids if bid['value'] not in revealed)
+        elif domain['state'] == "CLOSED" and not domain['registered']:
+            for bid in domainBids:
+                # Double check the domain is actually in the node
+                if bid['value'] == domain['highest'] and isKnownDomain(domain['name']):
+                    pendingRegisters.append(bid)
 
-                    if not state_found:
-                        pending.append(bid)
-    return pending
+    return {"reveals": pendingReveals, "registers": pendingRegisters,
+            "namesByHash": {domain['nameHash']: domain['name'] for domain in domains if 'nameHash' in domain}}
 
 
-def getPendingRedeems(account, password):
-    hsw.rpc_selectWallet(account)
-    hsw.rpc_walletPassphrase(password, 10)
-    tx = hsw.rpc_createREDEEM('', 'default')
-    if tx['error']:
-        return []
-
-    pending = []
+def findPendingNames(outputs: list, covenantType: int, action: str, names: dict) -> list:
+    """Get the names from the covenant outputs of a redeem or finalize transaction."""
+    nameHashes = []
     try:
-        for output in tx['result']['outputs']:
-            if output['covenant']['type'] != 5:
+        for output in outputs:
+            if type(output) is not dict or 'covenant' not in output:
                 continue
-            if output['covenant']['action'] != "REDEEM":
+            if output['covenant'].get("type") != covenantType:
                 continue
-            nameHash = output['covenant']['items'][0]
-            # Try to get the name from hash
-            name = hsd.rpc_getNameByHash(nameHash)
-            if name['error']:
-                pending.append(nameHash)
-            else:
-                pending.append(name['result'])
+            if output['covenant'].get('action') != action:
+                continue
+            nameHashes.append(output['covenant']['items'][0])
     except Exception as e:
-        logger.error(f"Failed to parse redeems: {str(e)}", exc_info=True)
+        logger.error(f"Failed to parse {action.lower()}s: {str(e)}", exc_info=True)
 
-    return pending
+    # Names not in the wallet are looked up from the node in one batch
+    names.update(getNamesByHash([nameHash for nameHash in nameHashes if nameHash not in names]))
+    return [names.get(nameHash, nameHash) for nameHash in nameHashes]
 
 
-def getPendingRegisters(account):
-    bids = getBids(account)
-    domains = getDomains(account, False)
-    pending = []
-    for domain in domains:
-        if domain['state'] == "CLOSED" and not domain['registered']:
-            for bid in bids:
-                if bid['name'] == domain['name']:
-                    if bid['value'] == domain['highest']:
-                        # Double check the domain is actually in the node                        
-                        if isKnownDomain(domain['name']):
-                            pending.append(bid)
-    return pending
+def getPendingRedeemTX(account, password):
+    """Get the outputs of a redeem for all the wallet's bids, or None if the wallet couldn't be unlocked."""
+    hsw.rpc_selectWallet(account)
+    unlock = hsw.rpc_walletPassphrase(password, 10)
+    if isinstance(unlock, dict) and unlock.get('error'):
+        logger.error(f"Error unlocking wallet {account}: {unlock['error']}")
+        return None
+    tx = hsw.rpc_createREDEEM('', 'default')
+    if tx['error']:
+        return []
+    return tx['result']['outputs']
 
 
-def getPendingFinalizes(account, password):
+def getPendingFinalizeTX(account, password) -> list:
     tx = createBatch(f'{account}:{password}', [["FINALIZE"]])
     if 'error' in tx:
         return []
+    return tx.get('outputs', [])
 
-    pending = []
-    try:
-        for output in tx['outputs']:
-            if type(output) is not dict:
-                continue
-            if 'covenant' not in output:
-                continue
-            if output['covenant'].get("type") != 10:
-                continue
-            if output['covenant'].get('action') != "FINALIZE":
-                continue
-            nameHash = output['covenant']['items'][0]
-            # Try to get the name from hash
-            name = hsd.rpc_getNameByHash(nameHash)
-            if name['error']:
-                pending.append(nameHash)
-            else:
-                pending.append(name['result'])
-    except Exception as e:
-        logger.error(f"Failed to parse finalizes: {str(e)}", exc_info=True)
-    return pending
+
+def getPendingReveals(account):
+    return getPendingActions(account)["reveals"]
+
+
+def getPendingRedeems(account, password):
+    return getPendingActions(account, password)["redeems"]
+
+
+def getPendingRegisters(account):
+    return getPendingActions(account)["registers"]
+
+
+def getPendingFinalizes(account, password):
+    return getPendingActions(account, password)["finalizes"]
+
+
+TX_FETCH_WORKERS = int(os.getenv("TX_FETCH_WORKERS", 8))  # Concurrent tx fetches for the tx store
+CHAIN_TX_STORE_SIZE = int(os.getenv("CHAIN_TX_STORE_SIZE", 20000))  # Confirmed txs kept in the tx store
+FETCH_EXECUTORS = {}  # name -> (pid, executor)
+FETCH_EXECUTORS_LOCK = threading.Lock()
+
+
+def getFetchExecutor(name: str, workers: int) -> ThreadPoolExecutor:
+    """Get a named fetch pool for this process (a forked process needs its own threads)."""
+    with FETCH_EXECUTORS_LOCK:
+        pid, executor = FETCH_EXECUTORS.get(name, (None, None))
+        if pid != os.getpid():
+            executor = ThreadPoolExecutor(max_workers=max(workers, 1))
+            FETCH_EXECUTORS[name] = (os.getpid(), executor)
+        return executor
+
+
+def fetchTX(hash: str) -> dict:
+    tx = hsd.getTxByHash(hash)
+    if isinstance(tx, dict) and 'inputs' in tx and tx.get('height', -1) >= 0:
+        # Confirmed txs never change (apart from confirmations) so keep them
+        conn = cacheStore.getConnection('chain_txs')
+        conn.execute(
+            'INSERT OR REPLACE INTO txs (hash, height, data, accessed) VALUES (?, ?, ?, ?)',
+            (hash, tx['height'], json.dumps(tx), time.time())
+        )
+        conn.commit()
+    return tx
+
+
+def forgetChainTXs(height: int):
+    """Remove stored txs from blocks at or above a height after a chain reorg."""
+    conn = cacheStore.getConnection('chain_txs')
+    conn.execute('DELETE FROM txs WHERE height >= ?', (height,))
+    conn.commit()
+
+
+def pruneChainTXs():
+    """Keep the CHAIN_TX_STORE_SIZE most recently used txs in the tx store."""
+    conn = cacheStore.getConnection('chain_txs')
+    conn.execute(
+        'DELETE FROM txs WHERE hash IN (SELECT hash FROM txs ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+        (CHAIN_TX_STORE_SIZE,)
+    )
+    conn.commit()
 
 
-def getRevealTX(reveal):
+def getTXs(hashes: list) -> dict:
+    """
+    Get txs by hash, from the tx store if confirmed before and otherwise from the node in parallel.
+    Returns {hash: tx}. Stored txs keep the height and confirmations from when they were fetched.
+    """
+    hashes = list(dict.fromkeys(hashes))
+    txs = {}
+    conn = cacheStore.getConnection('chain_txs')
+    for start in range(0, len(hashes), 500):
+        chunk = hashes[start:start + 500]
+        rows = conn.execute(
+            f'SELECT hash, data FROM txs WHERE hash IN ({",".join("?" * len(chunk))})', chunk
+        ).fetchall()
+        for row in rows:
+            txs[row['hash']] = json.loads(row['data'])
+    if txs:
+        conn.executemany('UPDATE txs SET accessed = ? WHERE hash = ?', [(time.time(), hash) for hash in txs])
+        conn.commit()
+
+    missing = [hash for hash in hashes if hash not in txs]
+    if missing:
+        txs.update(zip(missing, getFetchExecutor("txs", TX_FETCH_WORKERS).map(fetchTX, missing)))
+        pruneChainTXs()
+    return txs
+
+
+def getRevealTXs(reveals: list) -> list:
+    """Get the bid tx hash for each reveal, fetching the reveal txs in one round."""
+    txs = getTXs([reveal['prevout']['hash'] for reveal in reveals])
+    return [getRevealTX(reveal, txs.get(reveal['prevout']['hash'])) for reveal in reveals]
+
+
+def getRevealTX(reveal, tx=None):
     prevout = reveal['prevout']
     hash = prevout['hash']
     index = prevout['index']
-    tx = hsd.getTxByHash(hash)
+    if tx is None:
+        tx = getTXs([hash])[hash]
     if 'inputs' not in tx:
         logger.error(f'Something is up with this tx: {hash}')
         logger.error(tx)
@@ -1121,7 +1682,7 @@ def revealAll(account):
                     }
                 }
 
-        return requests.post(get_wallet_api_url(), json={"method": "sendbatch", "params": [[["REVEAL"]]]}).json()
+        return httpClient.post(get_wallet_api_url(), json={"method": "sendbatch", "params": [[["REVEAL"]]]}).json()
     except Exception as e:
         return {
             "error": {
@@ -1155,7 +1716,7 @@ def redeemAll(account):
                     }
                 }
 
-        return requests.post(get_wallet_api_url(), json={"method": "sendbatch", "params": [[["REDEEM"]]]}).json()
+        return httpClient.post(get_wallet_api_url(), json={"method": "sendbatch", "params": [[["REDEEM"]]]}).json()
     except Exception as e:
         return {
             "error": {
@@ -1427,7 +1988,7 @@ def sendBatch(account, batch):
                         "message": response['error']['message']
                     }
                 }
-        response = requests.post(get_wallet_api_url(), json={
+        response = httpClient.post(get_wallet_api_url(), json={
             "method": "sendbatch",
             "params": [batch]
         }).json()
@@ -1476,7 +2037,7 @@ def createBatch(account, batch):
                         "message": response['error']['message']
                     }
                 }
-        response = requests.post(get_wallet_api_url(), json={
+        response = httpClient.post(get_wallet_api_url(), json={
             "method": "createbatch",
             "params": [batch]
         }).json()
@@ -1507,64 +2068,129 @@ def getMempoolTxs():
     return response['result'] if 'result' in response else []
 
 
-def getMempoolBids():
-    mempoolTxs = getMempoolTxs()
-    bids = {}
-    for txid in mempoolTxs:
-        tx = hsd.getTxByHash(txid)
-        if 'error' in tx and tx['error'] is not None:
-            logger.error(f"Error getting tx {txid}: {tx['error']}")
+MEMPOOL_FETCH_WORKERS = int(os.getenv("MEMPOOL_FETCH_WORKERS", 8))  # Concurrent mempool tx fetches
+MEMPOOL_SYNC_INTERVAL = 5  # Minimum seconds between mempool syncs
+
+# Bids in the mempool, updated with only the txs added or removed since the last sync
+MEMPOOL_INDEX = {"txids": set(), "bidsByTx": {}, "bidsByName": {}, "synced": 0}
+MEMPOOL_LOCK = threading.Lock()  # Guards MEMPOOL_INDEX
+MEMPOOL_SYNC_LOCK = threading.Lock()  # Only one thread syncs at a time
+
+
+def parseMempoolBids(txid: str, tx: dict) -> list:
+    """Get the (name, bid) pairs for the BID and REVEAL outputs of a mempool tx."""
+    bids = []
+    for output in tx['outputs']:
+        if output['covenant']['action'] not in ["BID", "REVEAL"]:
             continue
-        if 'outputs' not in tx:
-            logger.error(f"Error getting outputs for tx {txid}")
+        if output['covenant']['action'] == "REVEAL":
+            # Try to find bid tx from inputs
+            namehash = output['covenant']['items'][0]
+            for txInput in tx['inputs']:
+                if txInput['coin']['covenant']['action'] != "BID":
+                    continue
+                if txInput['coin']['covenant']['items'][0] != namehash:
+                    continue
+                name = txInput['coin']['covenant']['items'][2]
+                # Convert name from hex to ascii
+                name = bytes.fromhex(name).decode('ascii')
+
+                bids.append((name, {
+                    'txid': txid,
+                    'lockup': txInput['coin']['value'],
+                    'revealed': True,
+                    'height': -1,
+                    'value': output['value'],
+                    'sort_value': txInput['coin']['value'],
+                    'owner': "Unknown"
+                }))
             continue
-        for output in tx['outputs']:
-            if output['covenant']['action'] not in ["BID", "REVEAL"]:
-                continue
-            if output['covenant']['action'] == "REVEAL":
-                # Try to find bid tx from inputs
-                namehash = output['covenant']['items'][0]
-                for txInput in tx['inputs']:
-                    if txInput['coin']['covenant']['action'] != "BID":
-                        continue
-                    if txInput['coin']['covenant']['items'][0] != namehash:
-                        continue
-                    name = txInput['coin']['covenant']['items'][2]
-                    # Convert name from hex to ascii
-                    name = bytes.fromhex(name).decode('ascii')
-
-                    bid = {
-                        'txid': txid,
-                        'lockup': txInput['coin']['value'],
-                        'revealed': True,
-                        'height': -1,
-                        'value': output['value'],
-                        'sort_value': txInput['coin']['value'],
-                        'owner': "Unknown"
-                    }
-                    if name not in bids:
-                        bids[name] = []
-                    bids[name].append(bid)               
-                continue
 
-            name = output['covenant']['items'][2]
-            # Convert name from hex to ascii
-            name = bytes.fromhex(name).decode('ascii')
-            if name not in bids:
-                bids[name] = []
-            bid = {
-                'txid': txid,
-                'value': -1000000,  # Default value if not found
-                'lockup': output['value'],
-                'revealed': False,
-                'height': -1,
-                'sort_value': output['value'],
-                'owner': "Unknown"
-            }
-            bids[name].append(bid)
+        name = output['covenant']['items'][2]
+        # Convert name from hex to ascii
+        name = bytes.fromhex(name).decode('ascii')
+        bids.append((name, {
+            'txid': txid,
+            'value': -1000000,  # Default value if not found
+            'lockup': output['value'],
+            'revealed': False,
+            'height': -1,
+            'sort_value': output['value'],
+            'owner': "Unknown"
+        }))
     return bids
 
 
+def fetchMempoolBids(txid: str):
+    """Fetch a mempool tx and parse its bids. Returns None if the tx couldn't be fetched."""
+    tx = hsd.getTxByHash(txid)
+    if 'error' in tx and tx['error'] is not None:
+        logger.error(f"Error getting tx {txid}: {tx['error']}")
+        return None
+    if 'outputs' not in tx:
+        logger.error(f"Error getting outputs for tx {txid}")
+        return None
+    try:
+        return parseMempoolBids(txid, tx)
+    except Exception as e:
+        logger.error(f"Error parsing mempool tx {txid}: {str(e)}")
+        return []
+
+
+def syncMempool():
+    """Update the mempool index with the txs added and removed since the last sync."""
+    if time.time() - MEMPOOL_INDEX["synced"] < MEMPOOL_SYNC_INTERVAL:
+        return
+    if not MEMPOOL_SYNC_LOCK.acquire(blocking=False):
+        # Another thread is syncing, use the current index
+        return
+    try:
+        response = hsd.rpc_getRawMemPool()
+        if response.get('error') is not None or not isinstance(response.get('result'), list):
+            return
+        txids = set(response['result'])
+        with MEMPOOL_LOCK:
+            known = set(MEMPOOL_INDEX["txids"])
+        added = [txid for txid in response['result'] if txid not in known]
+        removed = known - txids
+
+        fetched = dict(zip(added, getFetchExecutor("mempool", MEMPOOL_FETCH_WORKERS).map(fetchMempoolBids, added)))
+
+        with MEMPOOL_LOCK:
+            changedNames = set()
+            for txid in removed:
+                MEMPOOL_INDEX["txids"].discard(txid)
+                changedNames.update(name for name, _ in MEMPOOL_INDEX["bidsByTx"].pop(txid, []))
+            for txid, bids in fetched.items():
+                if bids is None:
+                    # Retried on the next sync
+                    continue
+                MEMPOOL_INDEX["txids"].add(txid)
+                MEMPOOL_INDEX["bidsByTx"][txid] = bids
+                changedNames.update(name for name, _ in bids)
+
+            # Rebuild the bids for names with added or removed txs
+            bidsByName = MEMPOOL_INDEX["bidsByName"]
+            for name in changedNames:
+                bidsByName.pop(name, None)
+            for txid, bids in MEMPOOL_INDEX["bidsByTx"].items():
+                for name, bid in bids:
+                    if name in changedNames:
+                        bidsByName.setdefault(name, []).append(bid)
+            MEMPOOL_INDEX["synced"] = time.time()
+    finally:
+        MEMPOOL_SYNC_LOCK.release()
+
+
+def getMempoolBids(domain=None):
+    """Get the bids and reveals in the mempool by name, or only those for one domain."""
+    syncMempool()
+    with MEMPOOL_LOCK:
+        if domain is not None:
+            return {domain: list(MEMPOOL_INDEX["bidsByName"].get(domain, []))}
+        return {name: list(bids) for name, bids in MEMPOOL_INDEX["bidsByName"].items()}
+
+
 
 
 # endregion
@@ -1614,7 +2240,7 @@ def zapTXs(account, age=1200):
         }
 
     try:
-        response = requests.post(get_wallet_api_url(f"/wallet/{account_name}/zap"),
+        response = httpClient.post(get_wallet_api_url(f"/wallet/{account_name}/zap"),
                                  json={"age": age,
                                        "account": "default"
                                        })
@@ -1640,7 +2266,7 @@ def getxPub(account):
         }
 
     try:
-        response = hsw.getAccountInfo(account_name, "default")
+        response = getAccountInfo(account_name)
         if 'error' in response:
             return {
                 "error": {
@@ -1780,7 +2406,7 @@ def get_wallet_api_url(path=''):
 def isSPV() -> bool:
     global SPV_MODE
     if SPV_MODE is None:
-        info = hsd.getInfo()
+        info = getNodeInfo()
         if 'error' in info:
             return False
         
@@ -1791,6 +2417,101 @@ def isSPV() -> bool:
             SPV_MODE = False
     return SPV_MODE
 
+# region Cache invalidation
+# Cached data is versioned by the chain tip and the wallet's balance snapshot
+# instead of wall-clock TTLs. An entry stays valid until a new block arrives
+# or a transaction affecting the wallet enters the mempool or gets confirmed.
+CHAIN_POLL_INTERVAL = float(os.getenv("CHAIN_POLL_INTERVAL", 10))
+BLOCK_LISTENERS = []
+CHAIN_WATCHER = {"pid": None, "tip": None}
+CHAIN_WATCHER_LOCK = threading.Lock()
+
+
+def chainVersion() -> str:
+    """Get a version string for the current chain tip."""
+    startChainWatcher()
+    info = getNodeInfo()
+    if 'error' in info:
+        return "offline"
+    chain = info.get('chain', {})
+    return f"{chain.get('height', 0)}:{chain.get('tip', '')}"
+
+
+def getWalletBalance(account: str):
+    return requestMemo(("walletBalance", account), hsw.getBalance, 'default', account)
+
+
+def walletVersion(account: str) -> str:
+    """
+    Get a version string for the wallet's state.
+    This changes whenever a tx for the wallet is added to the mempool or confirmed.
+    """
+    info = getWalletBalance(account)
+    if 'error' in info:
+        return "error"
+    state = [info.get(key) for key in ['tx', 'confirmed', 'unconfirmed', 'lockedConfirmed', 'lockedUnconfirmed']]
+    return hashlib.sha1(json.dumps([account, state]).encode()).hexdigest()[:16]
+
+
+def cacheVersion(account: str | None = None) -> str:
+    """Get the version to store with (and compare against) cached data."""
+    version = chainVersion()
+    if account:
+        version += ":" + walletVersion(account)
+    return version
+
+
+def onNewBlock(callback):
+    """Run callback(height) in the chain watcher thread whenever the chain tip changes."""
+    BLOCK_LISTENERS.append(callback)
+    startChainWatcher()
+
+
+def startChainWatcher():
+    """Start the chain watcher for this process (safe to call repeatedly and after forking)."""
+    with CHAIN_WATCHER_LOCK:
+        if CHAIN_WATCHER["pid"] == os.getpid():
+            return
+        CHAIN_WATCHER["pid"] = os.getpid()
+    threading.Thread(target=chainWatcher, daemon=True).start()
+
+
+def chainWatcher():
+    while True:
+        try:
+            pollChain()
+        except Exception as e:
+            logger.error(f"Error watching chain tip: {str(e)}", exc_info=True)
+        time.sleep(CHAIN_POLL_INTERVAL)
+
+
+def pollChain():
+    info = hsd.getInfo()
+    if 'error' in info:
+        return
+    with NODE_INFO_LOCK:
+        NODE_INFO_CACHE["time"] = time.time()
+        NODE_INFO_CACHE["info"] = info
+
+    chain = info.get('chain', {})
+    tip = chain.get('tip')
+    if tip == CHAIN_WATCHER["tip"]:
+        return
+    first = CHAIN_WATCHER["tip"] is None
+    CHAIN_WATCHER["tip"] = tip
+    if first:
+        return
+
+    height = chain.get('height', 0)
+    logger.info(f"New chain tip at height {height}")
+    for callback in BLOCK_LISTENERS:
+        try:
+            callback(height)
+        except Exception as e:
+            logger.error(f"Error in new block listener: {str(e)}", exc_info=True)
+
+# endregion
+
 # region HSD Internal Node
 
 
@@ -0,0 +1,90 @@
+"""
+Benchmark getBalance() in SPV mode against the number of domains in the wallet.
+
+The node/wallet calls are replaced with fixed responses so only the
+domain cache lookup is measured. Run from the repository root:
+
+    python benchmarks/balance.py [domain counts...]
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Keep the benchmark's cache databases out of the real cache directory
+os.chdir(tempfile.mkdtemp(prefix="firewallet-bench-"))
+
+import account  # noqa: E402
+import cacheStore  # noqa: E402
+
+# The previous per-name lookup took a lock to check a set of domains being updated
+PREVIOUS_LOCK = threading.Lock()
+PREVIOUS_ACTIVE = set()
+
+COUNTS = [int(count) for count in sys.argv[1:]] or [10, 100, 1000, 5000, 20000]
+RUNS = 5
+HEIGHT = 250000
+VERSION = "benchmark"
+
+
+def populate(count: int) -> list:
+    domains = [{"name": f"bench{i}", "state": "CLOSED", "value": 1000000} for i in range(count)]
+    conn = cacheStore.getConnection('domains')
+    conn.execute('DELETE FROM domains')
+    conn.executemany(
+        'INSERT INTO domains (name, info, last_updated, height, version) VALUES (?, ?, ?, ?, ?)',
+        [(domain["name"], json.dumps({"info": {"state": "CLOSED", "value": 1000000}}), 0, HEIGHT, VERSION)
+         for domain in domains]
+    )
+    conn.commit()
+    return domains
+
+
+def perNameLookup(domains: list):
+    """The previous approach: one query and one lock acquisition per domain."""
+    cursor = cacheStore.getConnection('domains').cursor()
+    value = 0
+    for domain in domains:
+        cursor.execute('SELECT info, height, version FROM domains WHERE name = ?', (domain["name"],))
+        row = cursor.fetchone()
+        with PREVIOUS_LOCK:
+            if not row and domain["name"] not in PREVIOUS_ACTIVE:
+                continue
+        info = json.loads(row['info'])
+        if info.get('info', {}).get('state', "") == "CLOSED":
+            value += info.get('info', {}).get('value', 0)
+    return value
+
+
+def timeit(func, *args) -> float:
+    best = None
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def main():
+    account.isSPV = lambda: True
+    account.getBlockHeight = lambda: HEIGHT
+    account.walletVersion = lambda name: VERSION
+    account.getWalletBalance = lambda name: {"confirmed": 10**12, "lockedConfirmed": 10**11}
+
+    print(f"{'domains':>8} {'getBalance (ms)':>16} {'previous per-name (ms)':>22}")
+    for count in COUNTS:
+        domains = populate(count)
+        account.getDomains = lambda name, own=True: domains
+        balance = timeit(account.getBalance, "benchmark")
+        perName = timeit(perNameLookup, domains)
+        print(f"{count:>8} {balance:>16.2f} {perName:>22.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,313 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger("firewallet")
+
+CACHE_DIR = 'cache'
+
+# Tables for each cache database
+SCHEMAS = {
+    "domains": [
+        '''
+        CREATE TABLE IF NOT EXISTS domains (
+            name TEXT PRIMARY KEY,
+            info TEXT,
+            last_updated INTEGER,
+            height INTEGER,
+            version TEXT
+        )
+        ''',
+    ],
+    "transactions": [
+        '''
+        CREATE TABLE IF NOT EXISTS txs (
+            account TEXT,
+            hash TEXT,
+            height INTEGER,
+            seq INTEGER,
+            data TEXT,
+            PRIMARY KEY (account, hash)
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS txs_order ON txs (account, height DESC, seq DESC)',
+        '''
+        CREATE TABLE IF NOT EXISTS tx_sync (
+            account TEXT PRIMARY KEY,
+            height INTEGER,
+            block TEXT,
+            version TEXT
+        )
+        ''',
+    ],
+    "wallet_domains": [
+        '''
+        CREATE TABLE IF NOT EXISTS wallet_domains (
+            account TEXT,
+            name TEXT,
+            state TEXT,
+            expires INTEGER,
+            value INTEGER,
+            data TEXT,
+            PRIMARY KEY (account, name)
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS wallet_domains_expires ON wallet_domains (account, expires)',
+        'CREATE INDEX IF NOT EXISTS wallet_domains_value ON wallet_domains (account, value)',
+        'CREATE INDEX IF NOT EXISTS wallet_domains_state ON wallet_domains (account, state, name)',
+        '''
+        CREATE TABLE IF NOT EXISTS wallet_domains_sync (
+            account TEXT PRIMARY KEY,
+            version TEXT
+        )
+        ''',
+    ],
+    "auctions": [
+        '''
+        CREATE TABLE IF NOT EXISTS auctions (
+            account TEXT,
+            bid TEXT,
+            seq INTEGER,
+            name TEXT,
+            value INTEGER,
+            bid_height INTEGER,
+            state TEXT,
+            domain_height INTEGER,
+            domain_seq INTEGER,
+            bid_data TEXT,
+            domain_data TEXT,
+            PRIMARY KEY (account, bid)
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS auctions_value ON auctions (account, value, seq)',
+        'CREATE INDEX IF NOT EXISTS auctions_state ON auctions (account, state, domain_seq, seq)',
+        'CREATE INDEX IF NOT EXISTS auctions_bid_height ON auctions (account, bid_height, seq)',
+        'CREATE INDEX IF NOT EXISTS auctions_domain_height ON auctions (account, domain_height, domain_seq, seq)',
+        'CREATE INDEX IF NOT EXISTS auctions_name ON auctions (account, name, seq)',
+        '''
+        CREATE TABLE IF NOT EXISTS auctions_sync (
+            account TEXT PRIMARY KEY,
+            version TEXT
+        )
+        ''',
+    ],
+    "chain_txs": [
+        '''
+        CREATE TABLE IF NOT EXISTS txs (
+            hash TEXT PRIMARY KEY,
+            height INTEGER,
+            data TEXT,
+            accessed REAL
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS txs_height ON txs (height)',
+        'CREATE INDEX IF NOT EXISTS txs_accessed ON txs (accessed)',
+    ],
+    "plugins": [
+        '''
+        CREATE TABLE IF NOT EXISTS generations (
+            plugin TEXT PRIMARY KEY,
+            generation INTEGER
+        )
+        ''',
+    ],
+    "lru": [
+        '''
+        CREATE TABLE IF NOT EXISTS entries (
+            cache TEXT,
+            key TEXT,
+            value TEXT,
+            version TEXT,
+            accessed REAL,
+            PRIMARY KEY (cache, key)
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS entries_accessed ON entries (cache, accessed)',
+    ],
+}
+
+# Columns added after a table was first released: {database: {table: {column: type}}}
+MIGRATIONS = {
+    "domains": {
+        "domains": {"height": "INTEGER", "version": "TEXT"},
+    },
+    "chain_txs": {
+        "txs": {"accessed": "REAL"},
+    },
+}
+
+INIT_LOCK = threading.Lock()
+INITIALIZED = set()
+CONNECTIONS = threading.local()
+
+
+def getPath(database: str) -> str:
+    return os.path.join(CACHE_DIR, f"{database}.db")
+
+
+def init():
+    """Create the cache databases and tables. Only runs once per process."""
+    with INIT_LOCK:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        for database, statements in SCHEMAS.items():
+            if database in INITIALIZED:
+                continue
+            conn = sqlite3.connect(getPath(database))
+            try:
+                # WAL lets readers continue while the background cache updates write
+                conn.execute('PRAGMA journal_mode=WAL')
+                for statement in statements:
+                    if 'CREATE TABLE' in statement:
+                        conn.execute(statement)
+                for table, columns in MIGRATIONS.get(database, {}).items():
+                    existing = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+                    for column, columnType in columns.items():
+                        if column not in existing:
+                            conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {columnType}')
+                # Indexes can use migrated columns
+                for statement in statements:
+                    if 'CREATE TABLE' not in statement:
+                        conn.execute(statement)
+                conn.commit()
+            finally:
+                conn.close()
+            INITIALIZED.add(database)
+
+
+def getConnection(database: str) -> sqlite3.Connection:
+    """
+    Get the calling thread's connection to a cache database.
+    Connections stay open for the life of the thread so statements stay prepared.
+    """
+    connections = getattr(CONNECTIONS, "connections", None)
+    if connections is None:
+        connections = {}
+        CONNECTIONS.connections = connections
+
+    conn = connections.get(database)
+    if conn is None:
+        if database not in INITIALIZED:
+            init()
+        conn = sqlite3.connect(getPath(database), timeout=10, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA synchronous=NORMAL')
+        connections[database] = conn
+    return conn
+
+
+class LRUCache:
+    """
+    Thread-safe cache holding at most max_size entries, evicting the least recently used.
+    Entries are stored with a version and only returned when the version matches.
+    With shared=True entries are kept in the "lru" cache database instead of memory,
+    so every worker process sees the same entries. Values must then be JSON serializable.
+    """
+
+    def __init__(self, name: str, max_size: int = 100, shared: bool = False):
+        self.name = name
+        self.max_size = max_size
+        self.shared = shared
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, version=None):
+        """Get a cached value, or None if missing or from a different version."""
+        if self.shared:
+            value = self._getShared(key, version)
+        else:
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry is not None and entry[0] == version:
+                    self.entries.move_to_end(key)
+                    value = entry[1]
+                else:
+                    value = None
+
+        with self.lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value, version=None):
+        if self.shared:
+            self._setShared(key, value, version)
+            return
+
+        with self.lock:
+            self.entries[key] = (version, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+        if self.shared:
+            conn = getConnection('lru')
+            conn.execute('DELETE FROM entries WHERE cache = ?', (self.name,))
+            conn.commit()
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": self._sharedSize() if self.shared else len(self.entries),
+                "maxSize": self.max_size,
+                "shared": self.shared,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hitRate": round(self.hits / lookups, 3) if lookups else 0,
+            }
+
+    def _getShared(self, key: str, version):
+        conn = getConnection('lru')
+        row = conn.execute(
+            'SELECT value, version FROM entries WHERE cache = ? AND key = ?',
+            (self.name, key)
+        ).fetchone()
+        if row is None or row['version'] != json.dumps(version):
+            return None
+        conn.execute(
+            'UPDATE entries SET accessed = ? WHERE cache = ? AND key = ?',
+            (time.time(), self.name, key)
+        )
+        conn.commit()
+        return json.loads(row['value'])
+
+    def _setShared(self, key: str, value, version):
+        conn = getConnection('lru')
+        conn.execute(
+            'INSERT OR REPLACE INTO entries (cache, key, value, version, accessed) VALUES (?, ?, ?, ?, ?)',
+            (self.name, key, json.dumps(value), json.dumps(version), time.time())
+        )
+        evicted = conn.execute(
+            '''
+            DELETE FROM entries WHERE cache = ? AND key IN (
+                SELECT key FROM entries WHERE cache = ? ORDER BY accessed DESC LIMIT -1 OFFSET ?
+            )
+            ''',
+            (self.name, self.name, self.max_size)
+        ).rowcount
+        conn.commit()
+        if evicted > 0:
+            with self.lock:
+                self.evictions += evicted
+
+    def _sharedSize(self) -> int:
+        return getConnection('lru').execute(
+            'SELECT COUNT(*) FROM entries WHERE cache = ?', (self.name,)
+        ).fetchone()[0]
+
+
+init()
@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import queue
+import threading
+import logging
+import dotenv
+import account as account_module
+
+logger = logging.getLogger("firewallet")
+
+dotenv.load_dotenv()
+
+EVENT_POLL_INTERVAL = int(os.getenv("EVENT_POLL_INTERVAL", 5))  # Seconds between mempool/wallet checks
+EVENT_STREAM_LIMIT = int(os.getenv("EVENT_STREAM_LIMIT", 2))  # Open event streams per server process
+EVENT_STREAM_TIMEOUT = 60  # Seconds before a stream is closed and the browser reconnects
+EVENT_HEARTBEAT = 15  # Seconds between keep-alive comments on an idle stream
+EVENT_RETRY = 20000  # Milliseconds a browser waits before reconnecting when no stream is free
+EVENT_WATCH_TIME = 120  # Seconds an account keeps being watched after its last client disconnects
+
+SUBSCRIBERS = {}  # queue -> account
+WATCHED_ACCOUNTS = {}  # account -> last time a client was connected
+LAST_EVENTS = {}  # (event, account) -> (id, last data sent), so only changes are pushed
+LAST_EVENT_ID = {"id": 0}
+EVENTS_LOCK = threading.Lock()
+POLLER = {"pid": None}
+
+
+def subscribe(account: str):
+    """
+    Open a subscription for an account's events.
+    Returns None when all event streams are in use.
+    """
+    watch(account)
+    with EVENTS_LOCK:
+        if len(SUBSCRIBERS) >= EVENT_STREAM_LIMIT:
+            return None
+        events = queue.Queue(maxsize=100)
+        SUBSCRIBERS[events] = account
+    return events
+
+
+def unsubscribe(events: queue.Queue):
+    with EVENTS_LOCK:
+        account = SUBSCRIBERS.pop(events, None)
+        if account:
+            WATCHED_ACCOUNTS[account] = time.time()
+
+
+def watch(account: str):
+    """Keep polling the account's wallet while a client is connected."""
+    startPoller()
+    with EVENTS_LOCK:
+        WATCHED_ACCOUNTS[account] = time.time()
+
+
+def nextEventId() -> int:
+    """
+    Get an id for a new event. Ids are based on the time in milliseconds so they
+    keep increasing across restarts and are comparable between server processes.
+    Must be called with EVENTS_LOCK held.
+    """
+    LAST_EVENT_ID["id"] = max(LAST_EVENT_ID["id"] + 1, int(time.time() * 1000))
+    return LAST_EVENT_ID["id"]
+
+
+def publish(event: str, data: dict, account=None):
+    """Send an event to the subscribers for an account (or everyone) if it changed since the last one."""
+    with EVENTS_LOCK:
+        last = LAST_EVENTS.get((event, account))
+        if last is not None and last[1] == data:
+            return
+        eventId = nextEventId()
+        LAST_EVENTS[(event, account)] = (eventId, data)
+        subscribers = [events for events, subscriber in SUBSCRIBERS.items() if account is None or subscriber == account]
+    for events in subscribers:
+        try:
+            events.put_nowait((eventId, event, data))
+        except queue.Full:
+            # The stream has stopped reading, it will get a snapshot when it reconnects
+            pass
+
+
+def snapshot(account: str, after: int = 0) -> list:
+    """Get the latest event of each type for an account, skipping any the browser already has (id <= after)."""
+    with EVENTS_LOCK:
+        return sorted((eventId, event, data) for (event, subscriber), (eventId, data) in LAST_EVENTS.items()
+                      if (subscriber is None or subscriber == account) and eventId > after)
+
+
+def formatEvent(eventId: int, event: str, data: dict) -> str:
+    return f"id: {eventId}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def parseEventId(lastEventId) -> int:
+    """Parse the Last-Event-ID header a reconnecting browser sends."""
+    try:
+        return int(lastEventId or 0)
+    except ValueError:
+        return 0
+
+
+def stream(account: str, events: queue.Queue, lastEventId: int = 0):
+    """
+    Server-sent events for a subscription, closed after EVENT_STREAM_TIMEOUT.
+    A reconnecting browser only gets the events newer than the last one it received.
+    """
+    try:
+        yield "retry: 1000\n\n"
+        for eventId, event, data in snapshot(account, lastEventId):
+            yield formatEvent(eventId, event, data)
+
+        end = time.time() + EVENT_STREAM_TIMEOUT
+        while time.time() < end:
+            try:
+                eventId, event, data = events.get(timeout=min(EVENT_HEARTBEAT, max(end - time.time(), 0.1)))
+            except queue.Empty:
+                yield ": heartbeat\n\n"
+                continue
+            yield formatEvent(eventId, event, data)
+    finally:
+        unsubscribe(events)
+
+
+def busyStream(account: str, lastEventId: int = 0) -> str:
+    """Response for a browser when no stream is free: any newer events and a slower reconnect."""
+    return f"retry: {EVENT_RETRY}\n\n" + "".join(
+        formatEvent(eventId, event, data) for eventId, event, data in snapshot(account, lastEventId)
+    )
+
+
+def onBlock(height: int):
+    info = account_module.getNodeInfo()
+    if 'error' in info:
+        return
+    chain = info.get('chain', {})
+    publish("block", {
+        "height": chain.get('height', height),
+        "sync": round(chain.get('progress', 0) * 100, 2),
+    })
+
+
+account_module.onNewBlock(onBlock)
+
+
+def startPoller():
+    """Start the event poller for this process (safe to call repeatedly and after forking)."""
+    with EVENTS_LOCK:
+        if POLLER["pid"] == os.getpid():
+            return
+        POLLER["pid"] = os.getpid()
+    account_module.startChainWatcher()
+    threading.Thread(target=poller, daemon=True).start()
+
+
+def poller():
+    while True:
+        try:
+            poll()
+        except Exception as e:
+            logger.error(f"Error polling for events: {str(e)}", exc_info=True)
+        time.sleep(EVENT_POLL_INTERVAL)
+
+
+def poll():
+    """Check the mempool and watched wallets once, however many browsers are connected."""
+    with EVENTS_LOCK:
+        now = time.time()
+        for account, seen in list(WATCHED_ACCOUNTS.items()):
+            if account not in SUBSCRIBERS.values() and now - seen > EVENT_WATCH_TIME:
+                del WATCHED_ACCOUNTS[account]
+        accounts = list(WATCHED_ACCOUNTS)
+    if not accounts:
+        return
+
+    if ("block", None) not in LAST_EVENTS:
+        # Send the current height before the first new block
+        onBlock(0)
+
+    mempool = account_module.hsd.rpc_getMemPoolInfo()
+    if mempool.get('error') is None and mempool.get('result'):
+        publish("mempool", {"size": mempool['result'].get('size', 0), "bytes": mempool['result'].get('bytes', 0)})
+
+    publish("walletSync", {"status": account_module.getWalletStatus()})
+    for account in accounts:
+        version = account_module.walletVersion(account)
+        if version != "error":
+            # Keep the pending tx count current for the dashboard
+            account_module.refreshPendingTransactions(account, version)
+            publish("wallet", {"version": version}, account)
@@ -0,0 +1,150 @@
+import os
+import threading
+import logging
+import dotenv
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from handywrapper import api
+from flask import g, has_request_context
+
+logger = logging.getLogger("firewallet")
+
+dotenv.load_dotenv()
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 10))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 60))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", 5))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", 2))
+
+# Number of distinct hosts to keep pools for (hsd node, hsd wallet, hsd.hns.au, plugin APIs)
+HTTP_POOL_HOSTS = 10
+
+STATS_LOCK = threading.Lock()
+# Counters from pools that have already been evicted and closed
+RETIRED_STATS = {"opened": 0, "requests": 0}
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter that keeps connection counters when a host pool is evicted."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pools.dispose_func = self._dispose_pool
+
+    @staticmethod
+    def _dispose_pool(pool):
+        with STATS_LOCK:
+            RETIRED_STATS["opened"] += pool.num_connections
+            RETIRED_STATS["requests"] += pool.num_requests
+        pool.close()
+
+
+# Only connection errors and gateway errors are retried.
+# POST (RPC calls such as sendbatch) is never retried once it has been sent.
+RETRY = Retry(
+    total=HTTP_RETRIES,
+    connect=HTTP_RETRIES,
+    read=HTTP_RETRIES,
+    status=HTTP_RETRIES,
+    backoff_factor=0.2,
+    status_forcelist=(502, 503, 504),
+    raise_on_status=False,
+)
+
+# The adapter (and its urllib3 pools) is thread-safe and shared by every session
+ADAPTER = PooledAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_SIZE,
+                        max_retries=RETRY)
+
+SESSIONS = threading.local()
+
+
+def getSession() -> requests.Session:
+    """Get the calling thread's session. All sessions share one connection pool."""
+    session = getattr(SESSIONS, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.mount("http://", ADAPTER)
+        session.mount("https://", ADAPTER)
+        SESSIONS.session = session
+    return session
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """Drop-in replacement for requests.request using the shared pool."""
+    kwargs.setdefault("timeout", (HTTP_CONNECT_TIMEOUT, HTTP_TIMEOUT))
+    if has_request_context():
+        # Count the calls made while handling this page/API request
+        g.hsd_calls = g.get("hsd_calls", 0) + 1
+    return getSession().request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, data=None, json=None, **kwargs) -> requests.Response:
+    return request("POST", url, data=data, json=json, **kwargs)
+
+
+def put(url: str, data=None, **kwargs) -> requests.Response:
+    return request("PUT", url, data=data, **kwargs)
+
+
+def patch(url: str, data=None, **kwargs) -> requests.Response:
+    return request("PATCH", url, data=data, **kwargs)
+
+
+def delete(url: str, **kwargs) -> requests.Response:
+    return request("DELETE", url, **kwargs)
+
+
+def getStats() -> dict:
+    """Get the number of connections opened and reused by the shared pool."""
+    with STATS_LOCK:
+        opened = RETIRED_STATS["opened"]
+        requests_sent = RETIRED_STATS["requests"]
+
+    pools = ADAPTER.poolmanager.pools
+    for key in pools.keys():
+        try:
+            pool = pools[key]
+        except KeyError:
+            # Evicted while iterating, already counted in RETIRED_STATS
+            continue
+        opened += pool.num_connections
+        requests_sent += pool.num_requests
+
+    return {
+        "opened": opened,
+        "reused": max(requests_sent - opened, 0),
+        "requests": requests_sent,
+        "poolSize": HTTP_POOL_SIZE,
+    }
+
+
+class PooledClient:
+    """Route handywrapper's HTTP calls through the shared pool."""
+
+    def _url(self, endpoint: str) -> str:
+        return f"http://x:{self.API_KEY}@{self.ADDRESS}:{self.PORT}{endpoint}"
+
+    def get(self, _endpoint: str):
+        return get(self._url(_endpoint)).json()
+
+    def post(self, _endpoint: str, _message: str = ''):
+        return post(self._url(_endpoint), _message).json()
+
+    def put(self, _endpoint: str, _message: str = ''):
+        return put(self._url(_endpoint), _message).json()
+
+    def delete(self, _endpoint: str, _message: str = ''):
+        return delete(self._url(_endpoint), data=_message).json()
+
+
+class hsd(PooledClient, api.hsd):
+    pass
+
+
+class hsw(PooledClient, api.hsw):
+    pass
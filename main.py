@@ -1,9 +1,11 @@
 import io
 import json
+import hashlib
 import random
 import sqlite3
 import sys
-from flask import Flask, make_response, redirect, request, jsonify, render_template, send_from_directory,send_file
+import threading
+from flask import Flask, g, make_response, redirect, request, jsonify, render_template, send_from_directory,send_file
 import os
 import dotenv
 import requests
@@ -12,7 +14,6 @@ from flask_qrcode import QRcode
 import urllib.parse
 import gitinfo
 import datetime
-import time
 import logging
 from logging.handlers import RotatingFileHandler
 
@@ -44,6 +45,9 @@ import render  # noqa: E402
 import domainLookup  # noqa: E402
 import account as account_module  # noqa: E402
 import plugin as plugins_module  # noqa: E402
+import httpClient  # noqa: E402
+import cacheStore  # noqa: E402
+import events  # noqa: E402
 
 app = Flask(__name__)
 qrcode = QRcode(app)
@@ -53,6 +57,16 @@ fees = 0.02
 revokeCheck = random.randint(100000,999999)
 THEME = os.getenv("THEME", "black")
 
+@app.context_processor
+def inject_hsd_calls():
+    # Number of HSD calls made so far while handling this request
+    return {"hsd_calls": g.get("hsd_calls", 0)}
+
+@app.after_request
+def add_hsd_calls_header(response):
+    response.headers["X-HSD-Calls"] = str(g.get("hsd_calls", 0))
+    return response
+
 @app.route('/')
 def index():
     # Check if the user is logged in
@@ -63,11 +77,7 @@ def index():
         return redirect("/logout")
 
     
-    plugins = ""
-    dashFunctions = plugins_module.getDashboardFunctions()
-    for function in dashFunctions:
-        functionOutput = plugins_module.runPluginFunction(function["plugin"],function["function"],{},request.cookies.get("account"))
-        plugins += render.plugin_output_dash(functionOutput,plugins_module.getPluginFunctionReturns(function["plugin"],function["function"]))
+    plugins = renderPlugins(plugins_module.getDashboardFunctions(),{},request.cookies.get("account"),True)
 
     # Check for updates
     if not os.path.exists(".git"):
@@ -91,9 +101,12 @@ def reverseDirection(direction: str):
 
 
 #region Transactions
-# Add a cache for transactions with a timeout
-tx_cache = {}
-TX_CACHE_TIMEOUT = 60*5  # Cache timeout in seconds
+# Rendered transaction pages, versioned by chain tip and wallet state
+TX_CACHE_SIZE = int(os.getenv("TX_CACHE_SIZE", 100))
+TX_CACHE_SHARED = os.getenv("TX_CACHE_SHARED", "false").lower() in ["1", "true", "yes"]
+tx_cache = cacheStore.LRUCache("transactions", TX_CACHE_SIZE, shared=TX_CACHE_SHARED)
+# Entries from older blocks can never be hit again
+account_module.onNewBlock(lambda height: tx_cache.clear())
 
 @app.route('/tx')
 def transactions():
@@ -272,9 +285,6 @@ def auctions():
         return redirect("/logout")
 
 
-    bids = account_module.getBids(account)
-    domains = account_module.getDomains(account,False)
-    
     # Sort
     sort = request.args.get("sort")
     if sort is None:
@@ -300,36 +310,25 @@ def auctions():
     if direction == "⬆":
         reverse = True
 
-    sortbyDomain = False
-
     if sort == "price":
-        # Sort by price
-        bids = sorted(bids, key=lambda k: k['value'],reverse=reverse)
         sort_price = direction
         sort_price_next = reverseDirection(direction)
     elif sort == "state":
         sort_state = direction
         sort_state_next = reverseDirection(direction)
-        domains = sorted(domains, key=lambda k: k['state'],reverse=reverse)
-        sortbyDomain = True
     elif sort == "time":
         sort_time = direction
         sort_time_next = reverseDirection(direction)
-
-        # If older HSD version sort by domain height
-        if len(bids) > 0:
-            if bids[0]['height'] == 0:
-                domains = sorted(domains, key=lambda k: k['height'],reverse=reverse)
-                sortbyDomain = True
-            else:
-                bids = sorted(bids, key=lambda k: k['height'],reverse=reverse)
     else:
         # Sort by domain
-        bids = sorted(bids, key=lambda k: k['name'],reverse=reverse)
+        sort = "name"
         sort_domain = direction
         sort_domain_next = reverseDirection(direction)
+
+    auctions = account_module.getAuctions(account, sort, reverse)
+    bids = auctions["bids"]
     
-    bidsHtml = render.bidDomains(bids,domains,sortbyDomain)
+    bidsHtml = render.auctions(auctions["auctions"],auctions["sortbyDomain"])
     plugins = ""
     message = ''
     if 'message' in request.args:
@@ -340,7 +339,7 @@ def auctions():
                            sort_state=sort_state,sort_domain=sort_domain,
                            sort_price_next=sort_price_next,
                            sort_state_next=sort_state_next,sort_domain_next=sort_domain_next,
-                           bids=len(bids),message=message,
+                           bids=bids,message=message,
                            sort_time=sort_time,sort_time_next=sort_time_next)
 
 
@@ -460,10 +459,7 @@ def search():
     
     plugins = "<div class='container-fluid'>"
     # Execute domain plugins
-    searchFunctions = plugins_module.getSearchFunctions()
-    for function in searchFunctions:
-        functionOutput = plugins_module.runPluginFunction(function["plugin"],function["function"],{"domain":search_term},account)
-        plugins += render.plugin_output(functionOutput,plugins_module.getPluginFunctionReturns(function["plugin"],function["function"]))
+    plugins += renderPlugins(plugins_module.getSearchFunctions(),{"domain":search_term},account)
 
     plugins += "</div>"
 
@@ -574,10 +570,7 @@ def manage(domain: str):
 
     plugins = "<div class='container-fluid'>"
     # Execute domain plugins
-    domainFunctions = plugins_module.getDomainFunctions()
-    for function in domainFunctions:
-        functionOutput = plugins_module.runPluginFunction(function["plugin"],function["function"],{"domain":domain},account)
-        plugins += render.plugin_output(functionOutput,plugins_module.getPluginFunctionReturns(function["plugin"],function["function"]))
+    plugins += renderPlugins(plugins_module.getDomainFunctions(),{"domain":domain},account)
 
     plugins += "</div>"
 
@@ -1476,6 +1469,40 @@ def report():
 #endregion
 
 #region Plugins
+def renderPluginOutput(function: dict, output, dash: bool = False) -> str:
+    returns = plugins_module.getPluginFunctionReturns(function["plugin"],function["function"])
+    if dash:
+        return render.plugin_output_dash(output,returns)
+    return render.plugin_output(output,returns)
+
+
+def renderPlugins(functions: list, params: dict, authentication, dash: bool = False) -> str:
+    """Run plugin functions in parallel, with placeholders for any that don't finish in time."""
+    html = ""
+    for result in plugins_module.runPluginFunctions(functions,params,authentication):
+        if result["token"]:
+            html += render.plugin_lazy(result["token"],dash)
+        else:
+            html += renderPluginOutput(result["function"],result["output"],dash)
+    return html
+
+
+@app.route('/api/v1/plugins/panel/<token>')
+def plugin_panel(token: str):
+    # Check if the user is logged in
+    if request.cookies.get("account") is None:
+        return jsonify({"error": "Not logged in"}), 401
+    account = account_module.check_account(request.cookies.get("account"))
+    if not account:
+        return jsonify({"error": "Invalid account"}), 401
+
+    panel = plugins_module.getLazyPanel(token,account,request.cookies.get("account"))
+    if panel is None:
+        return jsonify({"error": "Plugin panel not found"}), 404
+    function, output = panel
+    return jsonify({"html": renderPluginOutput(function,output,request.args.get("dash") == "1")})
+
+
 @app.route('/plugins')
 def plugins_index():
     # Check if the user is logged in
@@ -1629,8 +1656,15 @@ def api_hsd(function):
     if not account:
         return jsonify({"error": "Not logged in"})
         
+    if function == "names":
+        # Get rendered names for resolved namehashes
+        # Only namehashes (64 hex characters) are passed on to the resolver
+        hashes = [namehash.lower() for namehash in request.args.get('hashes', '').split(',')
+                  if re.fullmatch(r'[0-9a-fA-F]{64}', namehash)]
+        return jsonify({"result": render.getResolvedNames(hashes[:100])})
+
     if function == "mempoolBids": # This is a heavy function so only allow for logged in users
-        return jsonify({"result": account_module.getMempoolBids()})
+        return jsonify({"result": account_module.getMempoolBids(request.args.get('domain'))})
     
     if function == "nextAuctionState":
         # Get the domain from the query parameters
@@ -1713,6 +1747,68 @@ def api_hsd_mobile(function):
     
     return jsonify({"error": "Invalid function", "result": "Invalid mobile function"}), 400
 
+@app.route('/api/v1/events')
+def api_events():
+    """Server-sent events for new blocks, mempool changes and wallet changes."""
+    account = None
+    if request.cookies.get("account") is not None:
+        account = account_module.check_account(request.cookies.get("account"))
+    if account is None and request.authorization is not None:
+        account = account_module.check_account(f"{request.authorization.username}:{request.authorization.password}")
+    if not account:
+        return jsonify({"error": "Not logged in"}), 401
+
+    # Reconnecting browsers only need the events they missed
+    lastEventId = events.parseEventId(request.headers.get("Last-Event-ID"))
+    subscription = events.subscribe(account)
+    if subscription is None:
+        # All streams are in use, send the latest state and have the browser reconnect later
+        response = make_response(events.busyStream(account, lastEventId))
+    else:
+        response = app.response_class(events.stream(account, subscription, lastEventId))
+    response.mimetype = "text/event-stream"
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+
+def walletSummary(account):
+    """Everything shown on the dashboard, computed from one snapshot of the wallet."""
+    balance = account_module.getBalance(account)
+    # Redeems and finalizes need the wallet unlocked, so they're left to their own endpoints
+    pending = account_module.getPendingActions(account)
+    summary = {
+        "balance": balance,
+        "available": balance['available'],
+        "total": balance['total'],
+        "locked": balance.get('locked', 0),
+        "pending": account_module.getPendingTX(account),
+        "domainCount": len(account_module.getDomains(account)),
+        "bidCount": len(account_module.getBids(account)),
+        "pendingReveal": pending["reveals"],
+        "pendingRegister": pending["registers"],
+        "pendingRedeem": pending["redeems"],
+        "pendingFinalize": pending["finalizes"],
+        "sync": account_module.getWalletStatus(),
+        "hsd": {
+            "sync": account_module.getNodeSync(),
+            "version": account_module.hsdVersion(False),
+            "height": account_module.getBlockHeight(),
+        },
+    }
+    body = json.dumps({"result": summary}, sort_keys=True)
+    etag = hashlib.sha1(body.encode()).hexdigest()
+
+    if etag in request.if_none_match:
+        response = make_response("", 304)
+    else:
+        response = make_response(body)
+        response.mimetype = "application/json"
+    response.set_etag(etag)
+    # Let the browser revalidate instead of reusing a stale summary
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
 @app.route('/api/v1/wallet/<function>', methods=["GET"])
 def api_wallet(function):
 
@@ -1739,6 +1835,9 @@ def api_wallet(function):
     if function == "balance":
         return jsonify({"result": account_module.getBalance(account)})
 
+    if function == "summary":
+        return walletSummary(account)
+
     if function == "available":
         return jsonify({"result": account_module.getBalance(account)['available']})
     if function == "total":
@@ -1754,26 +1853,44 @@ def api_wallet(function):
     if function == "bidCount":
         return jsonify({"result": len(account_module.getBids(account))})
     
+    # All pending actions are found together and cached until the next block
     if function == "pendingReveal":
-        return jsonify({"result": account_module.getPendingReveals(account)})
+        return jsonify({"result": account_module.getPendingActions(account)["reveals"]})
     if function == "pendingRegister":
-        return jsonify({"result": account_module.getPendingRegisters(account)})
+        return jsonify({"result": account_module.getPendingActions(account)["registers"]})
     if function == "pendingRedeem":
-        return jsonify({"result": account_module.getPendingRedeems(account,password)})
+        return jsonify({"result": account_module.getPendingActions(account,password)["redeems"]})
     
     if function == "pendingFinalize":
-        return jsonify({"result": account_module.getPendingFinalizes(account,password)})
+        return jsonify({"result": account_module.getPendingActions(account,password)["finalizes"]})
 
     if function == "domains":
-        domains = account_module.getDomains(account)
-        if type(domains) is dict and 'error' in domains:
-            return jsonify({"result": [], "error": domains['error']})
+        # Optional paging, sorting and filtering (all domains are returned by default)
+        try:
+            offset = int(request.args.get('offset', 0))
+            limit = int(request.args['limit']) if 'limit' in request.args else None
+            expiresWithin = int(request.args['expiresWithin']) if request.args.get('expiresWithin') else None
+            minValue = float(request.args['minValue']) if request.args.get('minValue') else None
+        except ValueError:
+            return jsonify({"result": [], "error": "Invalid paging or filter parameter"}), 400
+
+        page = account_module.getDomainsPage(
+            account, offset, limit,
+            sort=request.args.get('sort', 'name').lower(),
+            direction=request.args.get('direction', 'asc').lower(),
+            state=request.args.get('state'),
+            expiresWithin=expiresWithin,
+            minValue=minValue
+        )
+        if 'error' in page:
+            return jsonify({"result": [], "error": page['error']})
+        domains = page['domains']
         
         # Add nameRender to each domain
         for domain in domains:
             domain['nameRender'] = renderDomain(domain['name'])
 
-        return jsonify({"result": domains})
+        return jsonify({"result": domains, "total": page['total'], "offset": offset, "limit": limit})
     
     if function == "transactions":
         # Get the page parameter
@@ -1792,12 +1909,12 @@ def api_wallet(function):
         # Create a cache key based on account and page
         cache_key = f"{account}_{page}"
         
-        # Check if data is in cache and not expired
-        current_time = time.time()
-        if not force_refresh and cache_key in tx_cache and (current_time - tx_cache[cache_key]['time'] < TX_CACHE_TIMEOUT):
-            transactions = tx_cache[cache_key]['data']
-            txCount = len(transactions)
-            transactions_html = render.transactions(transactions)
+        # Check if data is in cache and still for the current block and wallet state
+        version = account_module.cacheVersion(account)
+        cached = None if force_refresh else tx_cache.get(cache_key, version)
+        if cached:
+            transactions_html = cached['html']
+            txCount = cached['txCount']
         else:
             # Fetch transactions from account module
             transactions = account_module.getTransactions(account, page)
@@ -1805,11 +1922,10 @@ def api_wallet(function):
             transactions_html = render.transactions(transactions)
             
             # Store in cache
-            tx_cache[cache_key] = {
-                'data': transactions,
+            tx_cache.set(cache_key, {
                 'html': transactions_html,
-                'time': current_time
-            }
+                'txCount': txCount
+            }, version)
         
         return jsonify({
             "html": transactions_html,
@@ -1826,9 +1942,8 @@ def api_wallet(function):
             return jsonify({"result": [], "error": "No bids found"}), 404
         else:
             reveals = account_module.getReveals(account,domain)
-            for reveal in reveals:
-                # Get TX
-                revealInfo = account_module.getRevealTX(reveal)
+            # Get the bid for each reveal
+            for reveal, revealInfo in zip(reveals, account_module.getRevealTXs(reveals)):
                 reveal['bid'] = revealInfo
             bids = render.bids(bids,reveals)
         return jsonify({"result": bids})
@@ -1918,6 +2033,11 @@ def api_status():
             "latest": runningLatestVersion(),
             "url": f"https://git.woodburn.au/nathanwoodburn/firewalletbrowser/commit/{commit}" if commit != "Error" else None
         },
+        "http": httpClient.getStats(),
+        "txCache": tx_cache.stats(),
+        "domainRefresh": account_module.getDomainRefreshStats(),
+        "plugins": plugins_module.getPluginStats(),
+        "pluginCache": plugins_module.PLUGIN_CACHE.stats(),
         "error": error,
         "status": status
     }), status
@@ -2178,6 +2298,8 @@ if __name__ == '__main__':
             except ValueError:
                 pass
     print(f"Starting FireWallet on http://{host}:{port}",flush=True)
+    # Load the plugins before the first page needs them
+    plugins_module.getFunctionIndex()
     
     if "--debug" in sys.argv:
         console_handler = logging.StreamHandler(sys.stdout)
@@ -2195,4 +2317,57 @@ def tests():
     assert blocks_to_time(6) == "1 hrs"
     assert blocks_to_time(3) == "30 mins"
     assert blocks_to_time(1) == "10 mins"
-    assert blocks_to_time(10) == "1 hrs 40 mins"
\ No newline at end of file
+    assert blocks_to_time(10) == "1 hrs 40 mins"
+
+def tests_transactions_after_new_block(monkeypatch, tmp_path):
+    # Keep the tx index out of the real cache directory
+    monkeypatch.setattr(cacheStore, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(cacheStore, "INITIALIZED", set())
+    monkeypatch.setattr(cacheStore, "CONNECTIONS", threading.local())
+
+    chain = {"height": 100, "tip": "block100"}
+    history = [{"hash": "tx1", "height": 100}]
+    headers = {"100": "block100", "101": "block101"}
+
+    def getHeaderByHashOrHeight(heightOrHash):
+        # handywrapper builds the url with string concatenation, so the height must be a str
+        url = '/header/' + heightOrHash
+        return {"hash": headers[url.removeprefix('/header/')]}
+
+    monkeypatch.setattr(account_module, "getxPub", lambda account: "xpub")
+    monkeypatch.setattr(account_module, "walletVersion", lambda account: str(len(history)))
+    monkeypatch.setattr(account_module, "getNodeInfo", lambda: {"chain": dict(chain)})
+    monkeypatch.setattr(account_module, "hsdVersion", lambda: 7)
+    monkeypatch.setattr(account_module, "fetchTXHistory", lambda account, after=None: list(history))
+    monkeypatch.setattr(account_module.hsd, "getHeaderByHashOrHeight", getHeaderByHashOrHeight)
+
+    assert [tx["hash"] for tx in account_module.getTransactions("test")] == ["tx1"]
+
+    # New block with a new wallet tx
+    chain.update({"height": 101, "tip": "block101"})
+    history.insert(0, {"hash": "tx2", "height": 101})
+    assert [tx["hash"] for tx in account_module.getTransactions("test")] == ["tx2", "tx1"]
+    assert account_module.getAllTransactions("test")[1]["confirmations"] == 2
+
+    # New block where the header lookup fails
+    chain.update({"height": 102, "tip": "block102"})
+    monkeypatch.setattr(account_module.hsd, "getHeaderByHashOrHeight", lambda heightOrHash: '/header/' + heightOrHash + 1)
+    assert [tx["hash"] for tx in account_module.getTransactions("test")] == ["tx2", "tx1"]
+
+
+def tests_transaction_rows_per_wallet():
+    def output(value, own):
+        return {"value": value, "path": {"account": 0} if own else None,
+                "covenant": {"action": "NONE", "items": []}}
+
+    def transfer(sender: bool) -> dict:
+        # The same tx as seen by the sending and the receiving wallet
+        return {
+            "hash": "regression-transfer", "confirmations": 10, "mdate": "2025-06-27T01:49:14Z", "fee": 0,
+            "inputs": [{"value": 6000000, "path": {"account": 0} if sender else None}],
+            "outputs": [output(5000000, not sender), output(1000000, sender)],
+        }
+
+    assert "Sent 5.00" in render.transactions([transfer(True)])
+    assert "Received 5.00" in render.transactions([transfer(False)])
+    assert "Sent 5.00" in render.transactions([transfer(True)])
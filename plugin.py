@@ -4,13 +4,82 @@ import importlib
 import sys
 import hashlib
 import subprocess
+import threading
+import time
+import secrets
+import base64
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import account
+import cacheStore
+
+# Loaded plugin modules: module name -> {"module", "mtime", "size", "hash"}
+PLUGIN_MODULES = {}
+PLUGIN_MODULES_LOCK = threading.RLock()
+
+SIGNATURES_FILE = "user_data/plugin_signatures.json"
+SIGNATURES = {"stamp": None, "hashes": set()}  # Verified plugin hashes and the file's (mtime, size)
+SIGNATURES_LOCK = threading.RLock()
+PLUGIN_HASHES = {}  # plugin path -> ((mtime, size), hash)
+PLUGIN_HASHES_LOCK = threading.Lock()
+FUNCTION_INDEX = {"fingerprint": None, "functions": {}}  # Plugin functions by type
+FUNCTION_INDEX_LOCK = threading.Lock()
+
+PLUGIN_WORKERS = int(os.getenv("PLUGIN_WORKERS", 8))  # Plugin functions run at once
+PLUGIN_TIMEOUT = float(os.getenv("PLUGIN_TIMEOUT", 2))  # Seconds a page waits for its plugins
+PLUGIN_LAZY_TIMEOUT = 30  # Seconds a lazy-loaded panel waits for its plugin
+PLUGIN_MAX_RUNNING = 2  # Calls of one plugin function running at once
+RUNNING_PLUGINS = {}  # "plugin/function" -> running futures
+RUNNING_PLUGINS_LOCK = threading.Lock()
+PLUGIN_EXECUTOR = {"pid": None, "executor": None}
+PLUGIN_EXECUTOR_LOCK = threading.Lock()
+PLUGIN_STATS = {}  # "plugin/function" -> calls, errors, timeouts and latency
+PLUGIN_STATS_LOCK = threading.Lock()
+LAZY_PANELS = {}  # token -> (created, wallet, function, future)
+LAZY_PANELS_LOCK = threading.Lock()
+
+PLUGIN_CACHE_SIZE = int(os.getenv("PLUGIN_CACHE_SIZE", 500))  # Plugin outputs to cache
+PLUGIN_CACHE = cacheStore.LRUCache("plugins", PLUGIN_CACHE_SIZE)
 
 
 def import_module(module_name):
-    if module_name in sys.modules:
-        return importlib.reload(sys.modules[module_name])
-    else:
-        return importlib.import_module(module_name)
+    """
+    Get a plugin module, importing it the first time it is used.
+    It is only reloaded when the file has been modified and its contents changed.
+    """
+    path = module_name.replace(".", "/")
+    try:
+        stat = os.stat(path + ".py")
+    except OSError:
+        stat = None
+
+    with PLUGIN_MODULES_LOCK:
+        loaded = PLUGIN_MODULES.get(module_name)
+        if loaded and (stat is None or (loaded["mtime"], loaded["size"]) == (stat.st_mtime_ns, stat.st_size)):
+            return loaded["module"]
+
+        pluginHash = hashPlugin(path) if stat else None
+        if loaded and pluginHash == loaded["hash"]:
+            # Touched but not changed
+            loaded["mtime"] = stat.st_mtime_ns
+            loaded["size"] = stat.st_size
+            return loaded["module"]
+
+        if loaded:
+            module = importlib.reload(loaded["module"])
+        elif module_name in sys.modules:
+            module = sys.modules[module_name]
+        else:
+            # Pick up plugin directories cloned since the last import
+            importlib.invalidate_caches()
+            module = importlib.import_module(module_name)
+
+        PLUGIN_MODULES[module_name] = {
+            "module": module,
+            "mtime": stat.st_mtime_ns if stat else None,
+            "size": stat.st_size if stat else None,
+            "hash": pluginHash,
+        }
+        return module
 
 
 def listPlugins(update=False):
@@ -21,7 +90,7 @@ def listPlugins(update=False):
                 plugin = import_module("plugins."+file[:-3])
                 if "info" not in dir(plugin):
                     continue
-                details = plugin.info
+                details = dict(plugin.info)
                 details["source"] = "built-in"
                 details["link"] = f"plugins/{file[:-3]}"
                 plugins.append(details)
@@ -52,29 +121,14 @@ def listPlugins(update=False):
                     plugin = import_module(f"customPlugins.{importPath}."+file[:-3])
                     if "info" not in dir(plugin):
                         continue
-                    details = plugin.info
+                    details = dict(plugin.info)
                     details["source"] = importPath
                     details["link"] = f"customPlugins/{importPath}/{file[:-3]}"
                     plugins.append(details)
 
     # Verify plugin signature
-    signatures = []
-    try:
-        with open("user_data/plugin_signatures.json", "r") as f:
-            signatures = json.load(f)
-    except Exception as e:
-        print(f"Error loading plugin signatures: {e}")
-        # Write a new signatures file
-        with open("user_data/plugin_signatures.json", "w") as f:
-            json.dump(signatures, f)
-
     for plugin in plugins:
-        # Hash the plugin file
-        pluginHash = hashPlugin(plugin["link"])
-        if pluginHash not in signatures:
-            plugin["verified"] = False
-        else:
-            plugin["verified"] = True
+        plugin["verified"] = isVerified(plugin["link"])
 
     return plugins
 
@@ -83,29 +137,77 @@ def pluginExists(plugin: str):
     return os.path.exists(plugin+".py")
 
 
-def verifyPlugin(plugin: str):
-    signatures = []
-    try:
-        with open("user_data/plugin_signatures.json", "r") as f:
-            signatures = json.load(f)
-    except Exception as e:
-        print(f"Error loading plugin signatures: {e}")
-        # Write a new signatures file
-        with open("user_data/plugin_signatures.json", "w") as f:
-            json.dump(signatures, f)
+def getSignatures() -> set:
+    """Get the verified plugin hashes, only re-reading the signatures file when it changes."""
+    with SIGNATURES_LOCK:
+        try:
+            stat = os.stat(SIGNATURES_FILE)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = None
+        if stamp is not None and stamp == SIGNATURES["stamp"]:
+            return SIGNATURES["hashes"]
+
+        signatures = []
+        try:
+            with open(SIGNATURES_FILE, "r") as f:
+                signatures = json.load(f)
+        except Exception as e:
+            print(f"Error loading plugin signatures: {e}")
+            # Write a new signatures file
+            with open(SIGNATURES_FILE, "w") as f:
+                json.dump(signatures, f)
+            stat = os.stat(SIGNATURES_FILE)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+
+        SIGNATURES["stamp"] = stamp
+        SIGNATURES["hashes"] = set(signatures)
+        return SIGNATURES["hashes"]
+
+
+def isVerified(plugin: str) -> bool:
+    return hashPlugin(plugin) in getSignatures()
 
+
+def verifyPlugin(plugin: str):
     # Hash the plugin file
     pluginHash = hashPlugin(plugin)
-    if pluginHash not in signatures:
-        signatures.append(pluginHash)
-        with open("user_data/plugin_signatures.json", "w") as f:
-            json.dump(signatures, f)
+    with SIGNATURES_LOCK:
+        signatures = getSignatures()
+        if pluginHash in signatures:
+            return
+        try:
+            with open(SIGNATURES_FILE, "r") as f:
+                stored = json.load(f)
+        except Exception:
+            stored = list(signatures)
+        stored.append(pluginHash)
+        with open(SIGNATURES_FILE, "w") as f:
+            json.dump(stored, f)
+        # Force a reload so the stamp matches the new file
+        SIGNATURES["stamp"] = None
+    getSignatures()
 
 
 def hashPlugin(plugin: str):
+    """Hash a plugin file, reusing the last hash while the file's mtime and size are unchanged."""
+    stat = os.stat(plugin+".py")
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with PLUGIN_HASHES_LOCK:
+        cached = PLUGIN_HASHES.get(plugin)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+    pluginHash = hashFile(plugin+".py")
+    with PLUGIN_HASHES_LOCK:
+        PLUGIN_HASHES[plugin] = (stamp, pluginHash)
+    return pluginHash
+
+
+def hashFile(path: str):
     BUF_SIZE = 65536
     sha256 = hashlib.sha256()
-    with open(plugin+".py", 'rb') as f:
+    with open(path, 'rb') as f:
         while True:
             data = f.read(BUF_SIZE)
             if not data:
@@ -117,18 +219,7 @@ def hashPlugin(plugin: str):
 def getPluginData(pluginStr: str):
     plugin = import_module(pluginStr.replace("/","."))
 
-    # Check if the plugin is verified
-    signatures = []
-    try:
-        with open("user_data/plugin_signatures.json", "r") as f:
-            signatures = json.load(f)
-    except Exception as e:
-        print(f"Error loading plugin signatures: {e}")
-        # Write a new signatures file
-        with open("user_data/plugin_signatures.json", "w") as f:
-            json.dump(signatures, f)
-
-    info = plugin.info
+    info = dict(plugin.info)
     info["source"] = "built-in"
 
     # Check if the plugin is in customPlugins
@@ -140,12 +231,8 @@ def getPluginData(pluginStr: str):
 
 
 
-    # Hash the plugin file
-    pluginHash = hashPlugin(pluginStr)
-    if pluginHash not in signatures:
-        info["verified"] = False
-    else:
-        info["verified"] = True
+    # Check if the plugin is verified
+    info["verified"] = isVerified(pluginStr)
 
     return info
 
@@ -169,32 +256,69 @@ def runPluginFunction(plugin: str, function: str, params: dict, authentication:
     # Get the function object from the plugin module
     plugin_function = getattr(plugin_module, function)
 
-    # Check if the function is in the signature list
-    signatures = []
-    try:
-        with open("user_data/plugin_signatures.json", "r") as f:
-            signatures = json.load(f)
-    except Exception as e:
-        print(f"Error loading plugin signatures: {e}")
-        # Write a new signatures file
-        with open("user_data/plugin_signatures.json", "w") as f:
-            json.dump(signatures, f)
-
-    # Hash the plugin file
-    pluginHash = hashPlugin(plugin)
-    if pluginHash not in signatures:
+    # Check if the plugin is in the signature list
+    if not isVerified(plugin):
         return {"error": "Plugin not verified"}
 
+    # Use the cached output if the function declares a cache policy
+    policy = plugin_module.functions[function].get("cache")
+    if policy:
+        cacheKey, version = pluginCacheKey(plugin, function, params, authentication, policy)
+        cached = PLUGIN_CACHE.get(cacheKey, version)
+        if cached is not None and ("ttl" not in policy or time.time() < cached["expires"]):
+            return cached["output"]
+    # Actions can change what the plugin's other functions return
+    isAction = not policy and plugin_module.functions[function].get("type", "default") == "default"
+
     # Call the function with provided parameters
     try:
         result = plugin_function(params, authentication)
-        return result
     except Exception as e:
         print(f"Error running plugin: {e}")
         return {"error": str(e)}
+    finally:
+        if isAction:
+            # Drop the cached outputs once the action is done, so outputs
+            # stored while it was running aren't kept
+            bumpPluginGeneration(plugin)
+
+    if policy and not (isinstance(result, dict) and "error" in result):
+        PLUGIN_CACHE.set(cacheKey, {"output": result, "expires": time.time() + policy.get("ttl", 0)}, version)
+    return result
     # return plugin.runFunction(function, params, authentication)
 
 
+def getPluginGeneration(plugin: str) -> int:
+    """Get the number of actions run for a plugin, shared between server processes."""
+    row = cacheStore.getConnection('plugins').execute(
+        'SELECT generation FROM generations WHERE plugin = ?', (plugin,)
+    ).fetchone()
+    return row['generation'] if row else 0
+
+
+def bumpPluginGeneration(plugin: str):
+    conn = cacheStore.getConnection('plugins')
+    conn.execute(
+        'INSERT INTO generations (plugin, generation) VALUES (?, 1) '
+        'ON CONFLICT(plugin) DO UPDATE SET generation = generation + 1',
+        (plugin,)
+    )
+    conn.commit()
+
+
+def pluginCacheKey(plugin: str, function: str, params: dict, authentication: str, policy: dict) -> tuple:
+    """
+    Get the cache key and version for a plugin function's output.
+    Outputs are cached per wallet unless the policy says they only depend on the domain.
+    """
+    wallet = None if policy.get("domain") else authentication.split(":")[0]
+    cacheKey = json.dumps([plugin, function, params, wallet], sort_keys=True, default=str)
+    version = str(getPluginGeneration(plugin))
+    if policy.get("block"):
+        version += ":" + account.chainVersion()
+    return cacheKey, version
+
+
 def getPluginFunctionInputs(plugin: str, function: str):
     imported_plugin = import_module(plugin.replace("/","."))
     return imported_plugin.functions[function]["params"]
@@ -205,46 +329,219 @@ def getPluginFunctionReturns(plugin: str, function: str):
     return imported_plugin.functions[function]["returns"]
 
 
-def getDomainFunctions():
-    plugins = listPlugins()
-    domainFunctions = []
-    for plugin in plugins:
-        functions = getPluginFunctions(plugin["link"])
-        for function in functions:
-            if functions[function]["type"] == "domain":
-                domainFunctions.append({
+def pluginsFingerprint() -> tuple:
+    """Plugin files with their mtimes and sizes, which change when plugins are added, removed or updated."""
+    files = []
+    directories = ["plugins"]
+    if os.path.isdir("customPlugins"):
+        directories += [entry.path for entry in os.scandir("customPlugins") if entry.is_dir()]
+    for directory in directories:
+        for entry in os.scandir(directory):
+            if entry.name.endswith(".py"):
+                stat = entry.stat()
+                files.append((entry.path, stat.st_mtime_ns, stat.st_size))
+    try:
+        stat = os.stat("user_data/plugins.json")
+        files.append(("user_data/plugins.json", stat.st_mtime_ns, stat.st_size))
+    except OSError:
+        pass
+    return tuple(sorted(files))
+
+
+def getFunctionIndex() -> dict:
+    """
+    Get the plugin functions grouped by type.
+    The index is only rebuilt when plugins are added, removed or updated.
+    """
+    fingerprint = pluginsFingerprint()
+    with FUNCTION_INDEX_LOCK:
+        if FUNCTION_INDEX["fingerprint"] == fingerprint:
+            return FUNCTION_INDEX["functions"]
+
+        functionIndex = {}
+        for plugin in listPlugins():
+            functions = getPluginFunctions(plugin["link"])
+            for function in functions:
+                functionIndex.setdefault(functions[function]["type"], []).append({
                     "plugin": plugin["link"],
                     "function": function,
-                    "description": functions[function]["description"]
+                    "type": functions[function]["type"],
+                    "description": functions[function]["description"],
+                    "timeout": functions[function].get("timeout")
                 })
-    return domainFunctions
+
+        # Listing can clone imported plugins, so take the fingerprint again
+        FUNCTION_INDEX["fingerprint"] = pluginsFingerprint()
+        FUNCTION_INDEX["functions"] = functionIndex
+        return functionIndex
+
+
+def getDomainFunctions():
+    return list(getFunctionIndex().get("domain", []))
 
 
 def getSearchFunctions():
-    plugins = listPlugins()
-    searchFunctions = []
-    for plugin in plugins:
-        functions = getPluginFunctions(plugin["link"])
-        for function in functions:
-            if functions[function]["type"] == "search":
-                searchFunctions.append({
-                    "plugin": plugin["link"],
-                    "function": function,
-                    "description": functions[function]["description"]
-                })
-    return searchFunctions
+    return list(getFunctionIndex().get("search", []))
 
 
 def getDashboardFunctions():
-    plugins = listPlugins()
-    dashboardFunctions = []
-    for plugin in plugins:
-        functions = getPluginFunctions(plugin["link"])
-        for function in functions:
-            if functions[function]["type"] == "dashboard":
-                dashboardFunctions.append({
-                    "plugin": plugin["link"],
-                    "function": function,
-                    "description": functions[function]["description"]
-                })
-    return dashboardFunctions
+    return list(getFunctionIndex().get("dashboard", []))
+
+
+def getPluginExecutor() -> ThreadPoolExecutor:
+    """Get the plugin pool for this process (a forked process needs its own threads)."""
+    with PLUGIN_EXECUTOR_LOCK:
+        if PLUGIN_EXECUTOR["pid"] != os.getpid():
+            PLUGIN_EXECUTOR["pid"] = os.getpid()
+            PLUGIN_EXECUTOR["executor"] = ThreadPoolExecutor(max_workers=max(PLUGIN_WORKERS, 1))
+        return PLUGIN_EXECUTOR["executor"]
+
+
+def recordPluginStat(function: dict, **counts):
+    key = f"{function['plugin']}/{function['function']}"
+    with PLUGIN_STATS_LOCK:
+        stats = PLUGIN_STATS.setdefault(key, {
+            "calls": 0, "errors": 0, "timeouts": 0, "busy": 0, "totalTime": 0, "maxTime": 0
+        })
+        for name, value in counts.items():
+            if name == "time":
+                stats["totalTime"] += value
+                stats["maxTime"] = max(stats["maxTime"], value)
+                stats["lastTime"] = value
+            else:
+                stats[name] += value
+
+
+def timedPluginFunction(function: dict, params: dict, authentication):
+    start = time.perf_counter()
+    try:
+        result = runPluginFunction(function["plugin"], function["function"], params, authentication)
+    except Exception as e:
+        print(f"Error running plugin: {e}")
+        result = {"error": str(e)}
+    elapsed = round((time.perf_counter() - start) * 1000, 1)
+    recordPluginStat(function, calls=1, time=elapsed, errors=1 if isinstance(result, dict) and "error" in result else 0)
+    return result
+
+
+def submitPluginFunction(function: dict, params: dict, authentication):
+    """
+    Start a plugin function on the plugin pool.
+    Returns None when PLUGIN_MAX_RUNNING calls of the function are still running,
+    so a plugin that hangs can't take over the pool.
+    """
+    key = f"{function['plugin']}/{function['function']}"
+    with RUNNING_PLUGINS_LOCK:
+        running = RUNNING_PLUGINS.setdefault(key, set())
+        if len(running) >= PLUGIN_MAX_RUNNING:
+            return None
+        future = getPluginExecutor().submit(timedPluginFunction, function, params, authentication)
+        running.add(future)
+
+    def finished(future):
+        with RUNNING_PLUGINS_LOCK:
+            running.discard(future)
+    future.add_done_callback(finished)
+    return future
+
+
+def encodePanelToken(function: dict, params: dict) -> str:
+    """Token for a slow panel, holding what's needed to run the function again in another process."""
+    data = {"id": secrets.token_hex(8), "plugin": function["plugin"], "function": function["function"], "params": params}
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+def decodePanelToken(token: str):
+    try:
+        data = json.loads(base64.urlsafe_b64decode(token.encode()))
+        return data["plugin"], data["function"], data["params"]
+    except Exception:
+        return None
+
+
+def runPluginFunctions(functions: list, params: dict, authentication) -> list:
+    """
+    Run plugin functions in parallel, waiting for each at most its timeout
+    (the function's "timeout" or PLUGIN_TIMEOUT seconds).
+    Returns [{"function", "output", "token"}] in the same order as functions.
+    Functions still running have no output and a token to get it later with getLazyPanel().
+    """
+    start = time.monotonic()
+    futures = [submitPluginFunction(function, params, authentication) for function in functions]
+    deadlines = {
+        future: start + (function.get("timeout") or PLUGIN_TIMEOUT)
+        for function, future in zip(functions, futures) if future is not None
+    }
+    pending = set(deadlines)
+    while pending:
+        now = time.monotonic()
+        pending = {future for future in pending if not future.done() and deadlines[future] > now}
+        if pending:
+            wait(pending, timeout=min(deadlines[future] for future in pending) - now, return_when=FIRST_COMPLETED)
+
+    results = []
+    wallet = authentication.split(":")[0] if authentication else None
+    for function, future in zip(functions, futures):
+        if future is None:
+            recordPluginStat(function, busy=1)
+            results.append({"function": function, "output": {"error": "Plugin is busy"}, "token": None})
+            continue
+        if future.done():
+            results.append({"function": function, "output": future.result(), "token": None})
+            continue
+        recordPluginStat(function, timeouts=1)
+        token = encodePanelToken(function, params)
+        with LAZY_PANELS_LOCK:
+            LAZY_PANELS[token] = (time.time(), wallet, function, future)
+        results.append({"function": function, "output": None, "token": token})
+
+    # Forget panels that were never loaded
+    with LAZY_PANELS_LOCK:
+        for token, panel in list(LAZY_PANELS.items()):
+            if time.time() - panel[0] > PLUGIN_LAZY_TIMEOUT * 2:
+                del LAZY_PANELS[token]
+    return results
+
+
+def getLazyPanel(token: str, wallet: str, authentication: str):
+    """
+    Wait for a plugin function that didn't finish in time for its page.
+    If the function was started by another server process (or has been forgotten) it is run again.
+    Returns (function, output), or None if the token isn't for a dashboard, domain or search function.
+    """
+    with LAZY_PANELS_LOCK:
+        panel = LAZY_PANELS.pop(token, None)
+    if panel is not None and panel[1] == wallet:
+        function, future = panel[2], panel[3]
+    else:
+        decoded = decodePanelToken(token)
+        if decoded is None:
+            return None
+        plugin, functionName, params = decoded
+        functionIndex = getFunctionIndex()
+        function = None
+        for functionType in ["dashboard", "domain", "search"]:
+            for indexed in functionIndex.get(functionType, []):
+                if indexed["plugin"] == plugin and indexed["function"] == functionName:
+                    function = indexed
+        if function is None or not isinstance(params, dict):
+            return None
+        # Pages give dashboard functions the full authentication and the others only the wallet
+        future = submitPluginFunction(function, params, authentication if function["type"] == "dashboard" else wallet)
+        if future is None:
+            recordPluginStat(function, busy=1)
+            return function, {"error": "Plugin is busy"}
+
+    wait([future], timeout=PLUGIN_LAZY_TIMEOUT)
+    if not future.done():
+        return function, {"error": "Plugin timed out"}
+    return function, future.result()
+
+
+def getPluginStats() -> dict:
+    with PLUGIN_STATS_LOCK:
+        stats = {}
+        for key, values in PLUGIN_STATS.items():
+            stats[key] = dict(values)
+            stats[key]["averageTime"] = round(values["totalTime"] / values["calls"], 1) if values["calls"] else 0
+        return stats
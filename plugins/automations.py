@@ -1,5 +1,5 @@
 import account
-import requests
+import httpClient
 import threading
 import os
 import time
@@ -147,9 +147,9 @@ def automations_background(authentication):
             if response['error'] is not None:
                 return
             # Try to send the batch of all renew, reveal and redeem actions
-            requests.post(f"http://x:{KEY}@{IP}:{PORT}",json={"method": "sendbatch","params": [[["RENEW"]]]})
-            requests.post(f"http://x:{KEY}@{IP}:{PORT}",json={"method": "sendbatch","params": [[["REVEAL"]]]})
-            requests.post(f"http://x:{KEY}@{IP}:{PORT}",json={"method": "sendbatch","params": [[["REDEEM"]]]})
+            httpClient.post(f"http://x:{KEY}@{IP}:{PORT}",json={"method": "sendbatch","params": [[["RENEW"]]]})
+            httpClient.post(f"http://x:{KEY}@{IP}:{PORT}",json={"method": "sendbatch","params": [[["REVEAL"]]]})
+            httpClient.post(f"http://x:{KEY}@{IP}:{PORT}",json={"method": "sendbatch","params": [[["REDEEM"]]]})
         except Exception as e:
             print(e)
 
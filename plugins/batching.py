@@ -1,5 +1,5 @@
 import account
-import requests
+import httpClient
 
 
 
@@ -502,10 +502,10 @@ def advancedChangeLookahead(params, authentication):
     PORT = account.HSD_WALLET_PORT
 
     # Unlock wallet
-    response = requests.post(f"http://x:{KEY}@{IP}:{PORT}/wallet/{wallet}/unlock",
+    response = httpClient.post(f"http://x:{KEY}@{IP}:{PORT}/wallet/{wallet}/unlock",
         json={"passphrase": password, "timeout": 10})
 
-    response = requests.patch(f"http://x:{KEY}@{IP}:{PORT}/wallet/{wallet}/account/default",
+    response = httpClient.patch(f"http://x:{KEY}@{IP}:{PORT}/wallet/{wallet}/account/default",
         json={"lookahead": lookahead})
     
 
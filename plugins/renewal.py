@@ -1,5 +1,5 @@
 import account
-import requests
+import httpClient
 
 # Plugin Data
 info = {
@@ -52,7 +52,7 @@ def main(params, authentication):
     IP = account.HSD_IP
     PORT = account.HSD_WALLET_PORT
     
-    response = requests.post(f'http://x:{KEY}@{IP}:{PORT}/wallet/{wallet}/unlock',
+    response = httpClient.post(f'http://x:{KEY}@{IP}:{PORT}/wallet/{wallet}/unlock',
                              json={'passphrase': password, 'timeout': 600})
     if response.status_code != 200:
         print("Failed to unlock wallet")
@@ -71,7 +71,7 @@ def main(params, authentication):
         
         batchTX = "[" + ", ".join(batch) + "]"
         responseContent = f'{{"method": "sendbatch","params":[ {batchTX} ]}}'
-        response = requests.post(f'http://x:{KEY}@{IP}:{PORT}', data=responseContent)
+        response = httpClient.post(f'http://x:{KEY}@{IP}:{PORT}', data=responseContent)
         if response.status_code != 200:
             print("Failed to create batch",flush=True)
             print(f'Status code: {response.status_code}',flush=True)
@@ -1,6 +1,6 @@
 import json
 import account
-import requests
+import httpClient
 import os
 
 if not os.path.exists("user_data"):
@@ -21,6 +21,7 @@ functions = {
         "type": "dashboard",
         "description": "You need to login to the varo instance before you can use this function.",
         "params": {},
+        "cache": {"ttl": 300},
         "returns": {
             "status": 
             {
@@ -90,7 +91,7 @@ def status(params, authentication):
     data = {
         "action": "getInfo"
     }
-    response = requests.post(f"https://{instance}/api", json=data, headers=headers)
+    response = httpClient.post(f"https://{instance}/api", json=data, headers=headers)
     if response.status_code != 200:
         return {"status": "Error connecting to Varo"}
     if not response.json()["success"]:
@@ -106,7 +107,7 @@ def login(params, authentication):
     instance = instance.replace("https://", "")
     instance = instance.replace("http://", "")
 
-    response = requests.post(f"https://{instance}/api", json={"action": "getInfo"}, headers={"Authorization": f"Bearer {api}"})
+    response = httpClient.post(f"https://{instance}/api", json={"action": "getInfo"}, headers={"Authorization": f"Bearer {api}"})
     if response.status_code != 200:
         return {"status": "Error connecting to Varo"}
     
@@ -143,7 +144,7 @@ def addDomain(params, authentication):
     data = {
         "action": "getZones"
     }
-    zones = requests.post(f"https://{instance}/api", json=data, headers=headers)
+    zones = httpClient.post(f"https://{instance}/api", json=data, headers=headers)
     if zones.status_code != 200:
         return {"status": "Error connecting to Varo"}
     if not zones.json()["success"]:
@@ -166,7 +167,7 @@ def addDomain(params, authentication):
         "action": "createZone",
         "domain": domain
     }
-    response = requests.post(f"https://{instance}/api", json=data, headers=headers)
+    response = httpClient.post(f"https://{instance}/api", json=data, headers=headers)
     if response.status_code != 200:
         return {"status": "Error connecting to Varo"}
     if not response.json()["success"]:
@@ -176,7 +177,7 @@ def addDomain(params, authentication):
         "action": "showZone",
         "zone": zoneID
     }
-    response = requests.post(f"https://{instance}/api", json=data, headers=headers)
+    response = httpClient.post(f"https://{instance}/api", json=data, headers=headers)
     if response.status_code != 200:
         return {"status": "Error connecting to Varo"}
     if not response.json()["success"]:
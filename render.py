@@ -3,8 +3,13 @@ import json
 import urllib.parse
 from flask import render_template
 import os
+import time
+import atexit
 import threading
-import requests
+import queue
+import httpClient
+import cacheStore
+import account
 
 # Get Explorer URL
 TX_EXPLORER_URL = os.getenv("EXPLORER_TX")
@@ -13,56 +18,123 @@ if TX_EXPLORER_URL is None:
 
 
 NAMEHASH_CACHE = 'user_data/namehash_cache.json'
-# Validate cache version
-if os.path.exists(NAMEHASH_CACHE):
-    with open(NAMEHASH_CACHE, 'r') as f:
-        cache = json.load(f)
+NAMEHASH_FLUSH_INTERVAL = 5  # Seconds between writes of new entries to the cache file
+
+
+def loadNamehashCache() -> dict:
+    """Load the namehash cache file, resetting it if the format is invalid."""
+    if not os.path.exists(NAMEHASH_CACHE):
+        return {}
+    try:
+        with open(NAMEHASH_CACHE, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = None
     if not isinstance(cache, dict):
         print("Invalid namehash cache format. Resetting cache.")
-        with open(NAMEHASH_CACHE, 'w') as f:
-            json.dump({}, f)
+        return {}
     # Check if cache entries are valid
     for key in cache:
-        if not cache[key].startswith("<a href='/manage/"):
+        if not isinstance(cache[key], str) or not cache[key].startswith("<a href='/manage/"):
             print(f"Invalid cache entry for {key}. Resetting cache.")
-            with open(NAMEHASH_CACHE, 'w') as f:
-                json.dump({}, f)
-            break
+            return {}
+    return cache
+
+
+# Rendered names by namehash. Reads don't lock, new entries are written to disk in the background.
+NAMEHASH_NAMES = loadNamehashCache()
+NAMEHASH_DIRTY = threading.Event()
+NAMEHASH_FLUSHER = {"pid": None}
+CACHE_LOCK = threading.Lock()  # Serialises writes to the cache file
+
+
+def storeNamehash(namehash: str, rendered: str) -> None:
+    NAMEHASH_NAMES[namehash] = rendered
+    NAMEHASH_DIRTY.set()
+    with CACHE_LOCK:
+        if NAMEHASH_FLUSHER["pid"] == os.getpid():
+            return
+        NAMEHASH_FLUSHER["pid"] = os.getpid()
+    threading.Thread(target=namehashFlusher, daemon=True).start()
+
+
+def namehashFlusher() -> None:
+    while True:
+        NAMEHASH_DIRTY.wait()
+        time.sleep(NAMEHASH_FLUSH_INTERVAL)
+        flushNamehashCache()
+
 
+def flushNamehashCache() -> None:
+    """Write new entries to the cache file, keeping entries added by other processes."""
+    if not NAMEHASH_DIRTY.is_set():
+        return
+    with CACHE_LOCK:
+        NAMEHASH_DIRTY.clear()
+        try:
+            cache = loadNamehashCache()
+            cache.update(NAMEHASH_NAMES)
+            tmp = f"{NAMEHASH_CACHE}.{os.getpid()}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump(cache, f)
+            os.replace(tmp, NAMEHASH_CACHE)
+        except Exception as e:
+            NAMEHASH_DIRTY.set()
+            print(f"Exception writing namehash cache: {e}", flush=True)
 
 
-CACHE_LOCK = threading.Lock()
+atexit.register(flushNamehashCache)
 
 
 HNS_ICON = '<img src="/assets/img/HNS.png" width="20px" style="filter: invert(1);" />'
 
+ROW_CACHE_SIZE = int(os.getenv("ROW_CACHE_SIZE", 5000))  # Rendered table rows to keep
+ROW_CACHE = cacheStore.LRUCache("rows", ROW_CACHE_SIZE)
+
+
+def cachedRow(kind: str, key: str, fingerprint, renderRow, *args) -> str:
+    """
+    Render a table row, reusing the previous render while its fingerprint is unchanged.
+    The fingerprint must include everything shown in the row.
+    """
+    cacheKey = f"{kind}:{key}"
+    row = ROW_CACHE.get(cacheKey, fingerprint)
+    if row is None:
+        row = renderRow(*args)
+        ROW_CACHE.set(cacheKey, row, fingerprint)
+    return row
+
+
 def domains(domains, mobile=False):
-    html = ''
+    rows = []
     for domain in domains:
-        expires = domain['stats']
-        if 'daysUntilExpire' in expires:
-            expires = expires['daysUntilExpire']
-        else:
-            expires = "No expiration date"
-        paid = domain['value']
-        paid = paid / 1000000
-        
-        # Handle punycodes
-        name = renderDomain(domain['name'])
-
+        fingerprint = (domain['stats'].get('daysUntilExpire'), domain['value'], domain['registered'], mobile)
+        rows.append(cachedRow("domain", domain['name'], fingerprint, domainRow, domain, mobile))
+    return ''.join(rows)
 
-        link = f'/manage/{domain["name"]}'
-        link_action = "Manage"
-        if not domain['registered']:
-            link_action = "Register"
-            link = f'/auction/{domain["name"]}/register'
 
-        if not mobile:
-            html += f'<tr><td>{name}</td><td>{expires} days</td><td>{paid:,.2f} HNS</td><td><a href="{link}">{link_action}</a></td></tr>'
-        else:
-            html += f'<tr><td><a href="{link}">{name}</a></td><td>{expires} days</td></tr>'
+def domainRow(domain, mobile=False):
+    expires = domain['stats']
+    if 'daysUntilExpire' in expires:
+        expires = expires['daysUntilExpire']
+    else:
+        expires = "No expiration date"
+    paid = domain['value']
+    paid = paid / 1000000
     
-    return html
+    # Handle punycodes
+    name = renderDomain(domain['name'])
+
+
+    link = f'/manage/{domain["name"]}'
+    link_action = "Manage"
+    if not domain['registered']:
+        link_action = "Register"
+        link = f'/auction/{domain["name"]}/register'
+
+    if not mobile:
+        return f'<tr><td>{name}</td><td>{expires} days</td><td>{paid:,.2f} HNS</td><td><a href="{link}">{link_action}</a></td></tr>'
+    return f'<tr><td><a href="{link}">{name}</a></td><td>{expires} days</td></tr>'
 
 
 actionMap = {
@@ -89,114 +161,156 @@ actionMapPlural = {
     "NONE": "Multiple actions"
 }
 
+def collectNameHashes(txs) -> list:
+    """Get the name hashes used by covenants in a list of transactions."""
+    namehashes = {}
+    for tx in txs:
+        for output in tx["outputs"]:
+            items = output["covenant"]["items"]
+            if items:
+                namehashes[items[0]] = True
+    return list(namehashes)
+
+
+def prefetchNames(namehashes: list) -> dict:
+    """
+    Render the names for a list of name hashes.
+    Unknown hashes are looked up in one batch from the node,
+    any still missing are queued for the resolver and rendered as placeholders.
+    """
+    missing = [namehash for namehash in namehashes if namehash not in NAMEHASH_NAMES]
+    if missing:
+        for namehash, name in account.getNamesByHash(missing).items():
+            storeNamehash(namehash, renderNamehashLink(name))
+        resolveNamehashes(missing)
+
+    return {
+        namehash: NAMEHASH_NAMES.get(namehash) or renderNamehashPlaceholder(namehash)
+        for namehash in namehashes
+    }
+
+
 def transactions(txs):
     
     if len(txs) == 0:
         return '<tr><td colspan="5">No transactions found</td></tr>'
-    html = ''
+    # Resolve every name on the page before rendering
+    names = prefetchNames(collectNameHashes(txs))
+    rows = []
     for tx in txs:
-        action = "HNS Transfer"
-        txhash = tx["hash"]        
-        confirmations=tx["confirmations"]
-        mined_date = "Pending"
-        if confirmations >= 1:
-            mined_date = tx["mdate"]
-            if mined_date is None:
-                mined_date = "Pending"
+        # Rows only change while the tx is pending/recent or its name is still being resolved.
+        # Which inputs and outputs belong to the wallet sets the direction and amount,
+        # so the same tx renders differently for each wallet involved.
+        nameHash = next((output["covenant"]["items"][0] for output in tx["outputs"] if output["covenant"]["items"]), None)
+        ownership = (tuple(bool(txInput["path"]) for txInput in tx["inputs"]),
+                     tuple(bool(output["path"]) for output in tx["outputs"]))
+        fingerprint = (min(tx["confirmations"], 5), tx.get("mdate"), names.get(nameHash), ownership)
+        rows.append(cachedRow("tx", tx["hash"], fingerprint, transactionRow, tx, names))
+    return ''.join(rows)
+
+
+def transactionRow(tx, names):
+    action = "HNS Transfer"
+    txhash = tx["hash"]        
+    confirmations=tx["confirmations"]
+    mined_date = "Pending"
+    if confirmations >= 1:
+        mined_date = tx["mdate"]
+        if mined_date is None:
+            mined_date = "Pending"
+        else:
+            # Format 2025-06-27T01:49:14Z
+            mined_date = datetime.datetime.strptime(mined_date, "%Y-%m-%dT%H:%M:%SZ").strftime("%d %b %Y")
+    incomming = True
+    amount = 0
+    bid_value = 0
+    isMulti = 0
+    nameHashes = []
+    
+    for txInput in tx["inputs"]:
+        if txInput["path"]:
+            incomming = False
+            amount -= txInput["value"]
+
+    for output in tx["outputs"]:
+        if output["covenant"]["action"] != "NONE":
+            if action == "HNS Transfer":
+                action = output["covenant"]["action"]
+            elif action == output["covenant"]["action"]:
+                isMulti += 1
             else:
-                # Format 2025-06-27T01:49:14Z
-                mined_date = datetime.datetime.strptime(mined_date, "%Y-%m-%dT%H:%M:%SZ").strftime("%d %b %Y")
-        incomming = True
-        amount = 0
-        bid_value = 0
-        isMulti = 0
-        nameHashes = []
-        
-        for txInput in tx["inputs"]:
-            if txInput["path"]:
-                incomming = False
-                amount -= txInput["value"]
-
-        for output in tx["outputs"]:
-            if output["covenant"]["action"] != "NONE":
-                if action == "HNS Transfer":
-                    action = output["covenant"]["action"]
-                elif action == output["covenant"]["action"]:
-                    isMulti += 1
-                else:
-                    action = "Multiple Actions"
+                action = "Multiple Actions"
+    
         
-            
-            if output["covenant"]["items"] and len(output["covenant"]["items"]) > 0:
-                nameHashes.append(output["covenant"]["items"][0])
+        if output["covenant"]["items"] and len(output["covenant"]["items"]) > 0:
+            nameHashes.append(output["covenant"]["items"][0])
 
-            if not incomming:
-                if output["path"]:
-                    amount += output["value"]
-            else:
-                if output["path"] and output["covenant"]["action"] == "NONE":
-                    amount += output["value"]
+        if not incomming:
+            if output["path"]:
+                amount += output["value"]
+        else:
+            if output["path"] and output["covenant"]["action"] == "NONE":
+                amount += output["value"]
 
-            # Check if this is a bid
-            if output["covenant"]["action"] == "BID":
-                bid_value += output["value"]
-                amount -= output["value"]
+        # Check if this is a bid
+        if output["covenant"]["action"] == "BID":
+            bid_value += output["value"]
+            amount -= output["value"]
 
-        if not incomming:
-            # Subtract fee to make it easier to read
-            amount += tx["fee"]
+    if not incomming:
+        # Subtract fee to make it easier to read
+        amount += tx["fee"]
 
 
-        amount = amount / 1000000
-        bid_value = bid_value / 1000000
-        humanAction = action
+    amount = amount / 1000000
+    bid_value = bid_value / 1000000
+    humanAction = action
 
-        if action == "HNS Transfer":
-            if amount >= 0:
-                humanAction = f"Received {amount:,.2f} {HNS_ICON}"
-            else:
-                humanAction = f"Sent {(amount*-1):,.2f} {HNS_ICON}"
-        elif action == "FINALIZE":
-            if incomming and not isMulti:
-                humanAction = f"Received {renderFromNameHash(nameHashes[0])}"                    
-            elif incomming and isMulti:
-                humanAction = f"Received {isMulti + 1} domains"
-            elif not isMulti:
-                humanAction = f"Finalized {renderFromNameHash(nameHashes[0])}"
-            else:
-                humanAction = f"Finalized  {isMulti + 1} domain transfers"
-        elif action == "BID" and not isMulti:
-            humanAction = f"Bid {bid_value:,.2f} {HNS_ICON} on {renderFromNameHash(nameHashes[0])}"
-        elif isMulti:
-            humanAction = actionMapPlural.get(action, "Unknown Action")
-            humanAction = humanAction.replace("multiple", f'{isMulti + 1}')
+    if action == "HNS Transfer":
+        if amount >= 0:
+            humanAction = f"Received {amount:,.2f} {HNS_ICON}"
+        else:
+            humanAction = f"Sent {(amount*-1):,.2f} {HNS_ICON}"
+    elif action == "FINALIZE":
+        if incomming and not isMulti:
+            humanAction = f"Received {names[nameHashes[0]]}"                    
+        elif incomming and isMulti:
+            humanAction = f"Received {isMulti + 1} domains"
+        elif not isMulti:
+            humanAction = f"Finalized {names[nameHashes[0]]}"
         else:
-            humanAction  = actionMap.get(action, "Unknown Action")
-            humanAction += renderFromNameHash(nameHashes[0])
+            humanAction = f"Finalized  {isMulti + 1} domain transfers"
+    elif action == "BID" and not isMulti:
+        humanAction = f"Bid {bid_value:,.2f} {HNS_ICON} on {names[nameHashes[0]]}"
+    elif isMulti:
+        humanAction = actionMapPlural.get(action, "Unknown Action")
+        humanAction = humanAction.replace("multiple", f'{isMulti + 1}')
+    else:
+        humanAction  = actionMap.get(action, "Unknown Action")
+        humanAction += names[nameHashes[0]]
 
 
-        if amount < 0:
-            amount = f"<span style='color: red;'>{amount:,.2f}</span>"
-        elif amount > 0:
-            amount = f"<span style='color: green;'>+{amount:,.2f}</span>"
-        else:
-            amount = "<span style='color: gray;'>0.00</span>"
+    if amount < 0:
+        amount = f"<span style='color: red;'>{amount:,.2f}</span>"
+    elif amount > 0:
+        amount = f"<span style='color: green;'>+{amount:,.2f}</span>"
+    else:
+        amount = "<span style='color: gray;'>0.00</span>"
 
 
-        # hash = f"<a target='_blank' href='{TX_EXPLORER_URL}{hash}'>{hash[:8]}...</a>"
-        txdate = ""
-        if confirmations < 5:
-            txdate = f"<span style='color: red;'>{mined_date}</span>"
-        else:
-            txdate = f"<span>{mined_date}</span>"
-            # confirmations = f"<td class='hide-mobile'>{confirmations:,}</td>"
-        html += f'''
-        <tr>
-            <td style='white-space: nowrap;'>{txdate}</td>
-            <td><a style="color:var(--bs-body-color); text-decoration:none;" target="_blank" href="{TX_EXPLORER_URL}{txhash}">{humanAction}</a></td>                        
-        </tr>
-        '''
-    return html
+    # hash = f"<a target='_blank' href='{TX_EXPLORER_URL}{hash}'>{hash[:8]}...</a>"
+    txdate = ""
+    if confirmations < 5:
+        txdate = f"<span style='color: red;'>{mined_date}</span>"
+    else:
+        txdate = f"<span>{mined_date}</span>"
+        # confirmations = f"<td class='hide-mobile'>{confirmations:,}</td>"
+    return f'''
+    <tr>
+        <td style='white-space: nowrap;'>{txdate}</td>
+        <td><a style="color:var(--bs-body-color); text-decoration:none;" target="_blank" href="{TX_EXPLORER_URL}{txhash}">{humanAction}</a></td>                        
+    </tr>
+    '''
 
 
 def dns(data, edit=False):
@@ -299,76 +413,75 @@ def bids(bids,reveals):
     bid_data.sort(key=lambda x: x['sort_value'], reverse=True)
     
     # Generate HTML from sorted data
-    html = ''
+    rows = []
     for data in bid_data:
-        bid = data['bid']
-        lockup = data['lockup']
-        revealed = data['revealed']
-        value = data['value']
-        
-        html += "<tr>"
-        html += f"<td>{lockup:,.2f} HNS</td>"
-        
-        if revealed:
-            bidValue = lockup - value
-            html += f"<td>{value:,.2f} HNS</td>"
-            html += f"<td>{bidValue:,.2f} HNS</td>"
-        else:
-            html += "<td>Hidden until reveal</td>"
-            html += "<td>Hidden until reveal</td>"
-            
-        if bid['own']:
-            html += "<td>You</td>"
-        else:
-            html += "<td>Unknown</td>"
+        fingerprint = (data['lockup'], data['revealed'], data['value'], data['bid']['own'])
+        rows.append(cachedRow("bid", outpointKey(data['bid']), fingerprint, bidRow, data))
+    return ''.join(rows)
+
+
+def outpointKey(bid) -> str:
+    return f"{bid['prevout']['hash']}:{bid['prevout'].get('index', 0)}"
+
 
-        html += f"<td><a class='text-decoration-none' style='color: var(--bs-table-color-state, var(--bs-table-color-type, var(--bs-table-color)));' target='_blank' href='{TX_EXPLORER_URL}{bid['prevout']['hash']}'>Bid TX 🔗</a></td>"
-        html += "</tr>"
+def bidRow(data):
+    bid = data['bid']
+    lockup = data['lockup']
+    revealed = data['revealed']
+    value = data['value']
+
+    cells = [f"<td>{lockup:,.2f} HNS</td>"]
+    if revealed:
+        bidValue = lockup - value
+        cells.append(f"<td>{value:,.2f} HNS</td>")
+        cells.append(f"<td>{bidValue:,.2f} HNS</td>")
+    else:
+        cells.append("<td>Hidden until reveal</td>")
+        cells.append("<td>Hidden until reveal</td>")
         
-    return html
+    if bid['own']:
+        cells.append("<td>You</td>")
+    else:
+        cells.append("<td>Unknown</td>")
 
+    cells.append(f"<td><a class='text-decoration-none' style='color: var(--bs-table-color-state, var(--bs-table-color-type, var(--bs-table-color)));' target='_blank' href='{TX_EXPLORER_URL}{bid['prevout']['hash']}'>Bid TX 🔗</a></td>")
+    return f"<tr>{''.join(cells)}</tr>"
 
-def bidDomains(bids,domains, sortbyDomains=False):
-    html = ''
 
-    if not sortbyDomains:
-        for bid in bids:
-            for domain in domains:
-                if bid['name'] == domain['name']:
-                    lockup = bid['lockup']
-                    lockup = lockup / 1000000
-                    bidValue = bid['value'] / 1000000
-                    blind = lockup - bidValue
-
-                    if blind > 0:
-                        bidDisplay = f'<b>{bidValue:,.2f}</b> (+{blind:,.2f}) HNS'
-                    else:
-                        bidDisplay = f'<b>{bidValue:,.2f}</b> HNS'
-                    
-
-                    html += "<tr>"
-                    html += f"<td><a class='text-decoration-none' style='color: var(--bs-table-color-state, var(--bs-table-color-type, var(--bs-table-color)));' href='/auction/{domain['name']}'>{renderDomain(domain['name'])}</a></td>"
-                    html += f"<td>{domain['state']}</td>"
-                    html += f"<td style='white-space: nowrap;'>{bidDisplay}</td>"
-                    html += f"<td class='hide-mobile'>{domain['height']:,}</td>"
-                    html += "</tr>"
+def auctions(auctions, sortbyDomains=False):
+    """Render (bid, domain) pairs that have already been matched and sorted."""
+    return ''.join(bidDomainRowCached(bid, domain, sortbyDomains) for bid, domain in auctions)
+
+
+def bidDomainRowCached(bid, domain, sortbyDomains=False):
+    fingerprint = (bid['lockup'], bid['value'], domain['state'], domain['height'], sortbyDomains)
+    return cachedRow("bidDomain", outpointKey(bid), fingerprint, bidDomainRow, bid, domain, sortbyDomains)
+
+
+def bidDomainRow(bid, domain, sortbyDomains=False):
+    lockup = bid['lockup']
+    lockup = lockup / 1000000
+    bidValue = bid['value'] / 1000000
+    blind = lockup - bidValue
+
+    if sortbyDomains:
+        bidDisplay = f'<b>{bidValue:,.2f} HNS</b> + {blind:,.2f} HNS blind'
+        valueCell = f"<td>{bidDisplay}</td>"
     else:
-        for domain in domains:
-            for bid in bids:
-                if bid['name'] == domain['name']:
-                    lockup = bid['lockup']
-                    lockup = lockup / 1000000
-                    bidValue = bid['value'] / 1000000
-                    blind = lockup - bidValue
-
-                    bidDisplay = f'<b>{bidValue:,.2f} HNS</b> + {blind:,.2f} HNS blind'
-                    html += "<tr>"
-                    html += f"<td><a class='text-decoration-none' style='color: var(--bs-table-color-state, var(--bs-table-color-type, var(--bs-table-color)));' href='/auction/{domain['name']}'>{renderDomain(domain['name'])}</a></td>"
-                    html += f"<td>{domain['state']}</td>"
-                    html += f"<td>{bidDisplay}</td>"
-                    html += f"<td class='hide-mobile'>{domain['height']:,}</td>"
-                    html += "</tr>"
-    return html
+        if blind > 0:
+            bidDisplay = f'<b>{bidValue:,.2f}</b> (+{blind:,.2f}) HNS'
+        else:
+            bidDisplay = f'<b>{bidValue:,.2f}</b> HNS'
+        valueCell = f"<td style='white-space: nowrap;'>{bidDisplay}</td>"
+
+    return (
+        "<tr>"
+        f"<td><a class='text-decoration-none' style='color: var(--bs-table-color-state, var(--bs-table-color-type, var(--bs-table-color)));' href='/auction/{domain['name']}'>{renderDomain(domain['name'])}</a></td>"
+        f"<td>{domain['state']}</td>"
+        f"{valueCell}"
+        f"<td class='hide-mobile'>{domain['height']:,}</td>"
+        "</tr>"
+    )
 
 
 def wallets(wallets):
@@ -502,6 +615,12 @@ def plugin_output_dash(outputs, returns):
     return html
 
 
+def plugin_lazy(token: str, dash: bool = False) -> str:
+    """Placeholder for a plugin that didn't finish in time, filled in by script.min.js when it does."""
+    if dash:
+        return f'<div class="col-md-6 col-xl-3 mb-4 plugin-lazy" data-token="{token}" data-dash="1"></div>'
+    return f'<div class="plugin-lazy" data-token="{token}" data-dash="0"></div>'
+
 
 def renderDomain(name: str) -> str:
     """
@@ -518,38 +637,87 @@ def renderDomain(name: str) -> str:
     except Exception:
         return f"{name}/"
 
+NAMEHASH_WORKERS = int(os.getenv("NAMEHASH_WORKERS", 4))  # Concurrent namehash lookups
+NAMEHASH_QUEUE_SIZE = 1000  # Max namehashes waiting to be resolved
+
+NAMEHASH_QUEUE = queue.Queue(maxsize=NAMEHASH_QUEUE_SIZE)
+NAMEHASH_PENDING = set()  # Namehashes queued or being resolved
+NAMEHASH_PENDING_LOCK = threading.Lock()
+NAMEHASH_RESOLVER = {"pid": None}
+
+
+def renderNamehashLink(name: str) -> str:
+    rendered = renderDomain(name)
+    return f"<a href='/manage/{name}' target='_blank' style='color: var(--bs-table-color-state, var(--bs-table-color-type, var(--bs-table-color)));'>{rendered}</a>"
+
+
+def renderNamehashPlaceholder(namehash: str) -> str:
+    """Placeholder shown until the name is resolved, replaced by the page once it is."""
+    return f"<span class='namehash' data-namehash='{namehash}'>domain</span>"
+
+
+def startNamehashResolver() -> None:
+    """Start the resolver workers for this process (safe to call repeatedly and after forking)."""
+    with NAMEHASH_PENDING_LOCK:
+        if NAMEHASH_RESOLVER["pid"] == os.getpid():
+            return
+        NAMEHASH_RESOLVER["pid"] = os.getpid()
+    for _ in range(max(NAMEHASH_WORKERS, 1)):
+        threading.Thread(target=namehashWorker, daemon=True).start()
+
+
+def resolveNamehashes(namehashes) -> None:
+    """Queue unknown namehashes to be resolved in the background."""
+    startNamehashResolver()
+    with NAMEHASH_PENDING_LOCK:
+        for namehash in namehashes:
+            if namehash in NAMEHASH_NAMES or namehash in NAMEHASH_PENDING:
+                continue
+            try:
+                NAMEHASH_QUEUE.put_nowait(namehash)
+            except queue.Full:
+                # Will be queued again the next time the name is rendered
+                break
+            NAMEHASH_PENDING.add(namehash)
+
+
+def getResolvedNames(namehashes) -> dict:
+    """Get the rendered names for namehashes that have been resolved, queueing the rest."""
+    resolveNamehashes(namehashes)
+    return {namehash: NAMEHASH_NAMES[namehash] for namehash in namehashes if namehash in NAMEHASH_NAMES}
+
+
+def namehashWorker() -> None:
+    while True:
+        namehash = NAMEHASH_QUEUE.get()
+        try:
+            renderDomainAsync(namehash)
+        finally:
+            with NAMEHASH_PENDING_LOCK:
+                NAMEHASH_PENDING.discard(namehash)
+
+
+def lookupNamehash(namehash: str) -> dict:
+    """Look up a name from its hash, using the local node unless it is running in SPV mode."""
+    if not account.isSPV():
+        name = account.hsd.rpc_getNameByHash(namehash)
+        if name.get("error") is None and name.get("result"):
+            return name
+    return httpClient.get(f"https://hsd.hns.au/api/v1/namehash/{namehash}").json()
+
+
 def renderDomainAsync(namehash: str) -> None:
     """
     Get the domain name from HSD using its name hash and store it in the cache.
-    This function is meant to be run in the background.
+    This function is meant to be run by the resolver workers.
     """
     try:
-        with CACHE_LOCK:
-            if not os.path.exists(NAMEHASH_CACHE):
-                with open(NAMEHASH_CACHE, 'w') as f:
-                    json.dump({}, f)
-            with open(NAMEHASH_CACHE, 'r') as f:
-                cache = json.load(f)
-
-            if namehash in cache:
-                return
-        # Fetch the name outside the lock (network call) using hsd.hns.au
-        # name = account.hsd.rpc_getNameByHash(namehash)
-        name = requests.get(f"https://hsd.hns.au/api/v1/namehash/{namehash}").json()
+        if namehash in NAMEHASH_NAMES:
+            return
+        name = lookupNamehash(namehash)
 
         if name["error"] is None:
-            name = name["result"]
-            rendered = renderDomain(name)
-            rendered = f"<a href='/manage/{name}' target='_blank' style='color: var(--bs-table-color-state, var(--bs-table-color-type, var(--bs-table-color)));'>{rendered}</a>"
-
-
-            with CACHE_LOCK:
-                with open(NAMEHASH_CACHE, 'r') as f:
-                    cache = json.load(f)
-                cache[namehash] = rendered
-                with open(NAMEHASH_CACHE, 'w') as f:
-                    json.dump(cache, f)
-
+            storeNamehash(namehash, renderNamehashLink(name["result"]))
             return
         else:
             print(f"Error fetching name for hash {namehash}: {name['error']}", flush=True)
@@ -561,22 +729,10 @@ def renderDomainAsync(namehash: str) -> None:
 def renderFromNameHash(nameHash: str) -> str:
     """
     Render a domain name from its name hash.
-    Try to retrieve the name from the cache. If not, create a background task to fetch it.
+    Try to retrieve the name from the cache. If not, queue it to be resolved in the background.
     """
-    try:
-        with CACHE_LOCK:
-            if not os.path.exists(NAMEHASH_CACHE):
-                with open(NAMEHASH_CACHE, 'w') as f:
-                    json.dump({}, f)
-            with open(NAMEHASH_CACHE, 'r') as f:
-                cache = json.load(f)
-
-            if nameHash in cache:
-                return cache[nameHash]
-        thread = threading.Thread(target=renderDomainAsync, args=(nameHash,))
-        thread.start()
-        return "domain"
-
-    except Exception as e:
-        print(f"Exception in renderFromNameHash: {e}", flush=True)
-        return "domain"
\ No newline at end of file
+    rendered = NAMEHASH_NAMES.get(nameHash)
+    if rendered:
+        return rendered
+    resolveNamehashes([nameHash])
+    return renderNamehashPlaceholder(nameHash)
@@ -2,9 +2,12 @@ import sys
 import platform
 from main import app
 from waitress import serve
+import events
+import plugin
 
 
-threads = 4
+# Extra threads for the long-lived event streams, in Waitress and in each Gunicorn worker
+threads = 4 + events.EVENT_STREAM_LIMIT
 
 def gunicornServer():
     from gunicorn.app.base import BaseApplication
@@ -32,6 +35,9 @@ def gunicornServer():
     
 
 if __name__ == '__main__':
+    # Load the plugins before the first page needs them
+    plugin.getFunctionIndex()
+
     # Check if --gunicorn is in the command line arguments
     if "--gunicorn" in sys.argv:
         gunicornServer()